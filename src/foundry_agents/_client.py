@@ -6,18 +6,35 @@ configuration surface.
 """
 
 import asyncio
+import atexit
+import functools
 import logging
 import os
-import uuid
+import secrets
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Optional
 
+from azure.core.credentials import AccessToken, TokenCredential
 from azure.identity import DefaultAzureCredential, ManagedIdentityCredential, get_bearer_token_provider
 from azure.search.documents import SearchClient
+from azure.search.documents.indexes import SearchIndexClient
+import orjson
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
+from pydantic import BaseModel
 
-load_dotenv()
+try:
+    from azure.ai.projects import AIProjectClient
+except ImportError:  # pragma: no cover - only needed for Foundry agent features
+    AIProjectClient = None
+
+# Read .env once per process tree; re-imports and child processes skip the
+# filesystem walk that load_dotenv performs to locate the file.
+if not os.environ.get("_FOUNDRY_DOTENV_LOADED"):
+    load_dotenv(override=False)
+    os.environ["_FOUNDRY_DOTENV_LOADED"] = "1"
 
 logger = logging.getLogger("foundry-agents")
 
@@ -28,25 +45,68 @@ AZURE_AI_SEARCH_INDEX_NAME: str = os.getenv("AZURE_AI_SEARCH_INDEX_NAME", "proje
 AZURE_OPENAI_ENDPOINT: str = os.getenv("AZURE_OPENAI_ENDPOINT", "")
 AZURE_OPENAI_EMBEDDING_MODEL: str = os.getenv("AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
 AZURE_OPENAI_EMBEDDING_DIMENSIONS: int = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS", "1536"))
+AZURE_OPENAI_API_VERSION: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
+# HNSW graph parameters (Azure AI Search accepts m 4-10, ef* 100-1000)
+HNSW_M: int = int(os.getenv("HNSW_M", "10"))
+HNSW_EFC: int = int(os.getenv("HNSW_EFC", "400"))
+HNSW_EFS: int = int(os.getenv("HNSW_EFS", "500"))
 AZURE_OPENAI_COMPLETION_MODEL_NAME: str = os.getenv("AZURE_OPENAI_COMPLETION_MODEL_NAME", "")
+# Chat completions in flight at once; excess callers queue instead of hitting 429s
+AZURE_OPENAI_MAX_CONCURRENCY: int = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "4"))
 _RUNNING_IN_PRODUCTION: bool = os.getenv("RUNNING_IN_PRODUCTION", "false").lower() == "true"
 _AZURE_CLIENT_ID: str = os.getenv("AZURE_CLIENT_ID", "")
 
 # ── Lazy singletons ────────────────────────────────────────────────────────────
-_credential: Optional[DefaultAzureCredential] = None
-_chat_client: Optional[AzureOpenAI] = None
+_credential: Optional["_TokenCachingCredential"] = None
+_chat_client: Optional[AsyncAzureOpenAI] = None
 _embed_client: Optional[AzureOpenAI] = None
-_search_client: Optional[SearchClient] = None
+_search_clients: dict[str, SearchClient] = {}
+_index_client: Optional[SearchIndexClient] = None
 _project_client = None
 
 
-def get_credential() -> DefaultAzureCredential | ManagedIdentityCredential:
+# Refresh cached tokens this many seconds before they expire
+_TOKEN_REFRESH_MARGIN_SECS = 60
+
+
+class _TokenCachingCredential:
+    """Wrap a credential and reuse its tokens until shortly before they expire.
+
+    ``DefaultAzureCredential`` does not cache tokens for every source in its
+    chain – ``AzureCliCredential`` spawns ``az`` for every ``get_token`` call –
+    so the chat, embedding, and search clients would otherwise each pay that
+    cost per request.
+    """
+
+    def __init__(self, inner: TokenCredential) -> None:
+        self._inner = inner
+        self._tokens: dict[tuple[str, ...], AccessToken] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        # Claims challenges and tenant overrides must always reach the inner credential
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self._inner.get_token(*scopes, **kwargs)
+        with self._lock:
+            token = self._tokens.get(scopes)
+            if token is None or token.expires_on - _TOKEN_REFRESH_MARGIN_SECS <= time.time():
+                token = self._inner.get_token(*scopes, **kwargs)
+                self._tokens[scopes] = token
+            return token
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def get_credential() -> _TokenCachingCredential:
     global _credential
     if _credential is None:
+        inner: DefaultAzureCredential | ManagedIdentityCredential
         if _RUNNING_IN_PRODUCTION and _AZURE_CLIENT_ID:
-            _credential = ManagedIdentityCredential(client_id=_AZURE_CLIENT_ID)
+            inner = ManagedIdentityCredential(client_id=_AZURE_CLIENT_ID)
         else:
-            _credential = DefaultAzureCredential()
+            inner = DefaultAzureCredential()
+        _credential = _TokenCachingCredential(inner)
     return _credential
 
 
@@ -56,21 +116,22 @@ def get_project_client():
     if _project_client is None:
         if not AZURE_AI_PROJECT_ENDPOINT:
             return None
-        try:
-            from azure.ai.projects import AIProjectClient  # noqa: PLC0415
-
-            _project_client = AIProjectClient(
-                endpoint=AZURE_AI_PROJECT_ENDPOINT,
-                credential=get_credential(),
-            )
-        except ImportError:
+        if AIProjectClient is None:
             logger.error("azure-ai-projects is not installed")
             return None
+        _project_client = AIProjectClient(
+            endpoint=AZURE_AI_PROJECT_ENDPOINT,
+            credential=get_credential(),
+        )
     return _project_client
 
 
-def get_chat_client() -> Optional[AzureOpenAI]:
-    """Return an AzureOpenAI client for chat completions or None if not configured."""
+def get_chat_client() -> Optional[AsyncAzureOpenAI]:
+    """Return an AsyncAzureOpenAI client for chat completions or None if not configured.
+
+    Completions are awaited directly rather than run on a worker thread, so a
+    multi-second LLM call does not hold a default-executor thread.
+    """
     global _chat_client
     if _chat_client is None:
         if not AZURE_OPENAI_COMPLETION_MODEL_NAME:
@@ -80,9 +141,9 @@ def get_chat_client() -> Optional[AzureOpenAI]:
             cred, "https://cognitiveservices.azure.com/.default"
         )
         endpoint = AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT
-        _chat_client = AzureOpenAI(
+        _chat_client = AsyncAzureOpenAI(
             azure_deployment=AZURE_OPENAI_COMPLETION_MODEL_NAME,
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+            api_version=AZURE_OPENAI_API_VERSION,
             azure_endpoint=endpoint,
             azure_ad_token_provider=token_provider,
         )
@@ -100,7 +161,7 @@ def get_embed_client() -> AzureOpenAI:
         endpoint = AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT
         _embed_client = AzureOpenAI(
             azure_deployment=AZURE_OPENAI_EMBEDDING_MODEL,
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
+            api_version=AZURE_OPENAI_API_VERSION,
             azure_endpoint=endpoint,
             azure_ad_token_provider=token_provider,
         )
@@ -108,37 +169,189 @@ def get_embed_client() -> AzureOpenAI:
 
 
 def get_search_client(index_name: Optional[str] = None) -> Optional[SearchClient]:
-    """Return a SearchClient for the project-log index or None if not configured."""
-    global _search_client
-    if _search_client is None:
+    """Return a SearchClient for *index_name* or None if not configured.
+
+    One client is cached per index name so repeated uploads share the same
+    HTTP connection pool instead of paying a new TLS handshake each time.
+    """
+    if not AZURE_AI_SEARCH_ENDPOINT:
+        return None
+    name = index_name or AZURE_AI_SEARCH_INDEX_NAME
+    client = _search_clients.get(name)
+    if client is None:
+        client = SearchClient(
+            endpoint=AZURE_AI_SEARCH_ENDPOINT,
+            index_name=name,
+            credential=get_credential(),
+        )
+        _search_clients[name] = client
+    return client
+
+
+def get_index_client() -> Optional[SearchIndexClient]:
+    """Return the shared SearchIndexClient or None if not configured."""
+    global _index_client
+    if _index_client is None:
         if not AZURE_AI_SEARCH_ENDPOINT:
             return None
-        _search_client = SearchClient(
+        _index_client = SearchIndexClient(
             endpoint=AZURE_AI_SEARCH_ENDPOINT,
-            index_name=index_name or AZURE_AI_SEARCH_INDEX_NAME,
             credential=get_credential(),
         )
-    return _search_client
+    return _index_client
+
+
+@atexit.register
+def _close_search_clients() -> None:
+    global _index_client
+    clients = [*_search_clients.values(), _index_client]
+    for client in filter(None, clients):
+        try:
+            client.close()
+        except Exception:  # noqa: BLE001
+            pass
+    _search_clients.clear()
+    _index_client = None
+
+
+_WARMUP_SCOPES: tuple[str, ...] = (
+    "https://cognitiveservices.azure.com/.default",
+    "https://search.azure.com/.default",
+)
+
+
+async def warmup() -> None:
+    """Build the configured clients and fetch their tokens concurrently.
+
+    Failures are only logged; the first real request reports them properly.
+    """
+    cred = get_credential()
+    calls = [get_project_client, get_chat_client, get_search_client]
+    if AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT:
+        calls.append(get_embed_client)
+    calls.extend(functools.partial(cred.get_token, scope) for scope in _WARMUP_SCOPES)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(call) for call in calls),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Warm-up step failed: %s", result)
+
+
+# ── Structured-output completion ───────────────────────────────────────────────
+
+_completion_sem = asyncio.Semaphore(AZURE_OPENAI_MAX_CONCURRENCY)
+
+
+@functools.cache
+def _response_format(schema: type[BaseModel]) -> dict:
+    """Return the strict ``json_schema`` response format for *schema* (built once)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": _strict_schema(schema.model_json_schema()),
+            "strict": True,
+        },
+    }
+
+
+def _strict_schema(node):
+    """Close every object in a JSON schema and mark all its properties required.
+
+    Strict structured outputs reject schemas that allow extra or optional keys.
+    """
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    node = {key: _strict_schema(value) for key, value in node.items()}
+    if node.get("type") == "object" and "properties" in node:
+        node["additionalProperties"] = False
+        node["required"] = list(node["properties"])
+    return node
+
+
+async def structured_completion(
+    chat_client: AsyncAzureOpenAI,
+    schema: type[BaseModel],
+    instructions: str,
+    user_message: str,
+    *,
+    temperature: float,
+) -> dict:
+    """Run a structured-output chat completion and return its message as a dict.
+
+    The service guarantees ``content`` is JSON matching *schema*; it is left as
+    a string.  The raw response body is decoded with orjson, so none of the
+    SDK's response models (or a *schema* instance) are built only to be
+    dumped again.  ``content`` is None when the model refused (see ``refusal``).
+    """
+    async with _completion_sem:
+        raw = await chat_client.chat.completions.with_raw_response.create(
+            model=AZURE_OPENAI_COMPLETION_MODEL_NAME,
+            messages=[
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": user_message},
+            ],
+            response_format=_response_format(schema),
+            temperature=temperature,
+        )
+    return orjson.loads(raw.content)["choices"][0]["message"]
 
 
 # ── Embedding helper ───────────────────────────────────────────────────────────
 
-def embed_sync(text: str) -> list[float]:
+def embed_sync(texts: list[str]) -> list[list[float]]:
+    """Embed all *texts* in a single request; vectors are returned in input order."""
+    if not texts:
+        return []
     client = get_embed_client()
     response = client.embeddings.create(
-        input=text,
+        input=texts,
         model=AZURE_OPENAI_EMBEDDING_MODEL,
         dimensions=AZURE_OPENAI_EMBEDDING_DIMENSIONS,
     )
-    return response.data[0].embedding
+    return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+
+def embed_sync_one(text: str) -> list[float]:
+    return embed_sync([text])[0]
 
 
 async def embed(text: str) -> list[float]:
-    return await asyncio.to_thread(embed_sync, text)
+    return await asyncio.to_thread(embed_sync_one, text)
+
+
+async def embed_many(
+    texts: list[str],
+    batch_size: int = 2048,
+    max_concurrent: int = 35,
+) -> list[list[float]]:
+    """Embed any number of *texts*, issuing batches concurrently.
+
+    *texts* is split into slices of at most *batch_size* (the per-request input
+    limit of the embeddings API); at most *max_concurrent* requests are in
+    flight at once.  Vectors are returned in input order.
+    """
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def _embed_batch(batch: list[str]) -> list[list[float]]:
+        async with sem:
+            return await asyncio.to_thread(embed_sync, batch)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*(_embed_batch(b) for b in batches))
+    return [vector for batch in results for vector in batch]
 
 
 # ── Document builder ───────────────────────────────────────────────────────────
 
+# Rounded before upload: the index stores vectors int8-quantized anyway.
+_VECTOR_DECIMALS = 6
+
+
 def build_document(
     *,
     title: str,
@@ -151,16 +364,18 @@ def build_document(
     tags: list[str] | None = None,
     reference_url: str = "",
     architecture: str = "",
+    now: str | None = None,
 ) -> dict:
-    now = datetime.now(timezone.utc).isoformat()
+    """Build an index document; pass *now* to share one timestamp across a batch."""
+    now = now or datetime.now(timezone.utc).isoformat()
     return {
-        "id": str(uuid.uuid4()),
+        "id": secrets.token_hex(16),
         "title": title,
         "type": entry_type,
         "customer_name": customer_name,
         "short_summary": short_summary,
         "context": context,
-        "context_vector": context_vector,
+        "context_vector": [round(v, _VECTOR_DECIMALS) for v in context_vector],
         "project_name": project_name,
         "tags": tags or [],
         "reference_url": reference_url,
@@ -7,82 +7,216 @@ when available.
 
 import asyncio
 import logging
+import threading
+import time
 from typing import Optional
 
+from azure.core.exceptions import HttpResponseError
+
+try:
+    from azure.ai.agents.models import (
+        AgentThreadCreationOptions,
+        ListSortOrder,
+        ThreadMessageOptions,
+    )
+
+    _AGENTS_MODELS_OK = True
+except ImportError:  # pragma: no cover - azure-ai-agents is optional for search-only use
+    _AGENTS_MODELS_OK = False
+
 logger = logging.getLogger("foundry-agents")
 
-_TERMINAL_STATUSES = {"completed", "failed", "cancelled", "expired"}
-_POLL_INTERVAL_SECS = 2
+# The pipeline agents define no tools, so a run that asks for tool outputs
+# would never progress; treat it as finished (and failed) like the others.
+_TERMINAL_STATUSES = {"completed", "failed", "cancelled", "expired", "requires_action"}
+# Poll quickly at first so short runs return promptly, then back off so long
+# runs do not hammer the API.
+_POLL_INITIAL_SECS = 0.25
+_POLL_MAX_SECS = 4.0
+# Overall limit for one agent run, polling included
+_RUN_TIMEOUT_SECS = 300.0
+
+_AGENT_CACHE_TTL_SECS = 300
+_AGENT_CACHE: dict[tuple[int, str], tuple[float, object]] = {}
+_AGENT_LIST_TASKS: dict[int, asyncio.Future] = {}
 
 
 def find_agent_by_name_sync(project_client, name: str):
     """Return the first agent in the project whose name matches *name*, or None."""
-    agents = list(project_client.agents.list_agents())
+    # Iterate the pager directly so later pages are never fetched once found
     return next(
-        (a for a in agents if getattr(a, "name", None) == name),
+        (a for a in project_client.agents.list_agents() if getattr(a, "name", None) == name),
         None,
     )
 
 
 async def find_agent_by_name(project_client, name: str):
-    """Async wrapper around :func:`find_agent_by_name_sync`."""
-    return await asyncio.to_thread(find_agent_by_name_sync, project_client, name)
+    """Async, cached wrapper around :func:`find_agent_by_name_sync`.
 
+    Lookups (including misses) are remembered per project client for
+    ``_AGENT_CACHE_TTL_SECS`` so repeated workflow runs skip the full
+    ``list_agents`` enumeration.
+    """
+    key = (id(project_client), name)
+    cached = _AGENT_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _AGENT_CACHE_TTL_SECS:
+        return cached[1]
+    agent = await asyncio.to_thread(find_agent_by_name_sync, project_client, name)
+    _AGENT_CACHE[key] = (time.monotonic(), agent)
+    return agent
 
-async def invoke_and_wait(
+
+async def list_agents_cached(project_client) -> list:
+    """Return all agents in the project, listing them at most once per process.
+
+    Concurrent callers (e.g. several ``deploy()`` coroutines gathered together)
+    share the same in-flight request.
+    """
+    key = id(project_client)
+    task = _AGENT_LIST_TASKS.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            asyncio.to_thread(lambda: list(project_client.agents.list_agents()))
+        )
+        _AGENT_LIST_TASKS[key] = task
+    try:
+        return await task
+    except Exception:
+        _AGENT_LIST_TASKS.pop(key, None)
+        raise
+
+
+def invalidate_agent_cache(project_client, name: str) -> None:
+    """Forget cached lookups for *name*, e.g. after (re)deploying the agent."""
+    _AGENT_CACHE.pop((id(project_client), name), None)
+    task = _AGENT_LIST_TASKS.get(id(project_client))
+    if task is not None and task.done():
+        _AGENT_LIST_TASKS.pop(id(project_client), None)
+
+
+def _retry_after_secs(exc: HttpResponseError) -> float:
+    """Seconds requested by a throttled response's ``Retry-After`` header, or 0."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):  # absent, or an HTTP-date
+        return 0.0
+
+
+def _cancel_run(project_client, thread_id: str, run_id: str) -> None:
+    """Best-effort cancellation of a run that is being abandoned."""
+    try:
+        project_client.agents.cancel_run(thread_id=thread_id, run_id=run_id)
+    except Exception:
+        logger.warning("Could not cancel agent run %s", run_id, exc_info=True)
+
+
+def _run_agent_sync(
     project_client,
     agent_id: str,
     user_message: str,
+    *,
+    timeout_s: float = _RUN_TIMEOUT_SECS,
+    cancel_event: Optional[threading.Event] = None,
 ) -> str:
-    """Create a thread-and-run, poll until terminal, and return the assistant's reply.
+    """Blocking implementation of :func:`invoke_and_wait`.
 
-    Raises ``RuntimeError`` if the run ends in a non-completed state.
+    Creating the run, polling it, and reading the reply all happen on the
+    calling thread so the async wrapper needs only one thread hop per run.
+    Polling stops (and the run is cancelled) once *timeout_s* has elapsed or
+    *cancel_event* is set.
     """
-    from azure.ai.agents.models import (  # noqa: PLC0415
-        AgentThreadCreationOptions,
-        ListSortOrder,
-        ThreadMessageOptions,
-    )
-
-    thread_run = await asyncio.to_thread(
-        lambda: project_client.agents.create_thread_and_run(
-            agent_id=agent_id,
-            thread=AgentThreadCreationOptions(
-                messages=[ThreadMessageOptions(role="user", content=user_message)]
-            ),
-        )
+    if not _AGENTS_MODELS_OK:
+        raise RuntimeError("azure-ai-agents is not installed")
+
+    thread_run = project_client.agents.create_thread_and_run(
+        agent_id=agent_id,
+        thread=AgentThreadCreationOptions(
+            messages=[ThreadMessageOptions(role="user", content=user_message)]
+        ),
     )
 
     thread_id = thread_run.thread_id
     run_id = thread_run.id
 
-    # Poll until the run reaches a terminal status
+    # Poll with exponential backoff until the run reaches a terminal status
+    cancel_event = cancel_event or threading.Event()
+    deadline = time.monotonic() + timeout_s
+    delay = _POLL_INITIAL_SECS
     while True:
-        run = await asyncio.to_thread(
-            lambda: project_client.agents.get_run(thread_id=thread_id, run_id=run_id)
-        )
-        status = str(run.status)
-        if status in _TERMINAL_STATUSES:
-            break
-        await asyncio.sleep(_POLL_INTERVAL_SECS)
-
+        wait = delay
+        try:
+            run = project_client.agents.get_run(thread_id=thread_id, run_id=run_id)
+        except HttpResponseError as exc:
+            # Throttled polls back off instead of abandoning the run
+            if exc.status_code != 429:
+                raise
+            wait = max(delay, _retry_after_secs(exc))
+            logger.debug("get_run throttled; retrying in %.1fs", wait)
+        else:
+            # RunStatus is a str enum, so members hash/compare equal to their values
+            if run.status in _TERMINAL_STATUSES:
+                break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _cancel_run(project_client, thread_id, run_id)
+            raise TimeoutError(f"Agent run did not finish within {timeout_s:g}s")
+        # Event.wait doubles as the backoff sleep and returns early on cancel
+        if cancel_event.wait(min(wait, remaining)):
+            _cancel_run(project_client, thread_id, run_id)
+            raise RuntimeError("Agent run was cancelled")
+        delay = min(delay * 2, _POLL_MAX_SECS)
+
+    status = getattr(run.status, "value", run.status)
+    if status == "requires_action":
+        _cancel_run(project_client, thread_id, run_id)
     if status != "completed":
         err = getattr(run, "last_error", None)
         msg = getattr(err, "message", str(err)) if err else "unknown error"
         raise RuntimeError(f"Agent run ended with status '{status}': {msg}")
 
     # Retrieve the most recent assistant message
-    messages = await asyncio.to_thread(
-        lambda: project_client.agents.list_messages(
-            thread_id=thread_id,
-            order=ListSortOrder.DESCENDING,
-        )
+    messages = project_client.agents.list_messages(
+        thread_id=thread_id,
+        order=ListSortOrder.DESCENDING,
+        # Only the newest assistant message is needed; keep to one small page
+        limit=5,
     )
     for msg in messages:
-        if str(getattr(msg, "role", "")) == "assistant":
+        # MessageRole is a str enum: compare directly, str() gives "MessageRole.AGENT"
+        if getattr(msg, "role", "") == "assistant":
             for part in getattr(msg, "content", []):
                 text_obj = getattr(part, "text", None)
                 if text_obj is not None:
                     return getattr(text_obj, "value", str(text_obj))
 
     return ""
+
+
+async def invoke_and_wait(
+    project_client,
+    agent_id: str,
+    user_message: str,
+    *,
+    timeout_s: float = _RUN_TIMEOUT_SECS,
+) -> str:
+    """Create a thread-and-run, poll until terminal, and return the assistant's reply.
+
+    Raises ``RuntimeError`` if the run ends in a non-completed state and
+    ``TimeoutError`` if it does not finish within *timeout_s*.  Cancelling the
+    awaiting task stops the polling thread and cancels the run.
+    """
+    cancel_event = threading.Event()
+    try:
+        return await asyncio.to_thread(
+            _run_agent_sync,
+            project_client,
+            agent_id,
+            user_message,
+            timeout_s=timeout_s,
+            cancel_event=cancel_event,
+        )
+    except asyncio.CancelledError:
+        cancel_event.set()
+        raise
@@ -1,11 +1,37 @@
-"""HTML page fetch and text extraction utilities for the ``foundry_agents`` package."""
+"""HTML page fetch and text extraction utilities for the ``foundry_agents`` package.
 
+Text extraction uses the C-based selectolax (lexbor) parser when it is
+installed and falls back to the stdlib :class:`html.parser.HTMLParser`.
+"""
+
+import asyncio
 import re
 from html.parser import HTMLParser
 
 import httpx
 
-_SKIP_TAGS = frozenset({"script", "style", "nav", "footer", "head", "header", "noscript"})
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - optional accelerator
+    LexborHTMLParser = None
+
+# Only elements that never hold story text: <form> can wrap a whole page
+# (ASP.NET WebForms) and <button> sometimes carries CTA copy worth keeping.
+_SKIP_TAGS = frozenset({
+    "script", "style", "nav", "footer", "head", "header", "noscript",
+    "iframe", "svg", "template", "dialog",
+})
+_WS_RE = re.compile(r"\s{3,}")
+# Text nodes at least this long that repeat (share bars, CTAs, related-story
+# teasers) are kept only once; shorter nodes are often inline link text.
+_DEDUP_MIN_CHARS = 30
+
+# Story text sits well within the first couple of megabytes of any page
+_MAX_PAGE_BYTES = 2_000_000
+_READ_CHUNK_BYTES = 64 * 1024
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Concurrent page downloads across all callers (MCP tool calls, run_pipelines)
+_FETCH_SEM = asyncio.Semaphore(8)
 
 _USER_AGENT = (
     "Mozilla/5.0 (compatible; FoundryAgentsMCPServer/1.0; "
@@ -13,44 +39,129 @@ _USER_AGENT = (
 )
 
 
+def _compact(nodes) -> str:
+    """Join non-empty text nodes, dropping repeated sentence-length nodes."""
+    seen: set[str] = set()
+    kept: list[str] = []
+    for node in nodes:
+        if not node:
+            continue
+        if len(node) >= _DEDUP_MIN_CHARS:
+            if node in seen:
+                continue
+            seen.add(node)
+        kept.append(node)
+    return _WS_RE.sub("\n\n", " ".join(kept))
+
+
+class _EnoughTextError(Exception):
+    """Raised by :class:`_TextExtractor` once it has collected enough text."""
+
+
 class _TextExtractor(HTMLParser):
-    """Minimal HTML-to-plain-text converter that strips noise tags."""
+    """Minimal HTML-to-plain-text converter that strips noise tags.
 
-    def __init__(self) -> None:
+    Parsing is aborted with :class:`_EnoughTextError` once the collected text
+    comfortably exceeds *limit* characters, since the caller truncates anyway.
+    """
+
+    def __init__(self, limit: int | None = None) -> None:
         super().__init__()
         self._texts: list[str] = []
         self._depth: int = 0
+        self._total_len: int = 0
+        self._limit: int | None = limit
 
+    # HTMLParser already passes tag names lower-cased
     def handle_starttag(self, tag: str, attrs) -> None:
-        if tag.lower() in _SKIP_TAGS:
+        if tag in _SKIP_TAGS:
             self._depth += 1
 
     def handle_endtag(self, tag: str) -> None:
-        if tag.lower() in _SKIP_TAGS and self._depth > 0:
+        if self._depth and tag in _SKIP_TAGS:
             self._depth -= 1
 
     def handle_data(self, data: str) -> None:
-        if self._depth == 0 and data.strip():
-            self._texts.append(data.strip())
+        if self._depth == 0:
+            stripped = data.strip()
+            if stripped:
+                self._texts.append(stripped)
+                self._total_len += len(stripped) + 1
+                if self._limit is not None and self._total_len > self._limit * 2:
+                    raise _EnoughTextError
 
     def get_text(self) -> str:
-        return re.sub(r"\s{3,}", "\n\n", " ".join(self._texts))
+        return _compact(self._texts)
+
+
+def _extract_text_selectolax(html: str) -> str:
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(_SKIP_TAGS))
+    if tree.body is None:
+        return ""
+    # Separate text nodes with NUL so empty nodes can be dropped, matching the
+    # stdlib extractor's "stripped, non-empty nodes joined by a space" output.
+    return _compact(tree.body.text(separator="\x00", strip=True).split("\x00"))
 
 
 def extract_text(html: str, max_chars: int = 12_000) -> str:
     """Return visible text from an HTML string, truncated to *max_chars*."""
-    extractor = _TextExtractor()
-    extractor.feed(html)
+    if LexborHTMLParser is not None:
+        return _extract_text_selectolax(html)[:max_chars]
+    extractor = _TextExtractor(limit=max_chars)
+    try:
+        extractor.feed(html)
+    except _EnoughTextError:
+        pass
     return extractor.get_text()[:max_chars]
 
 
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient so connections are kept alive across fetches."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=30.0,
+            headers={"User-Agent": _USER_AGENT, "Accept-Encoding": "br, gzip"},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient; call before the event loop shuts down."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 async def fetch_page_text(url: str, max_chars: int = 12_000) -> str:
-    """Fetch a web page and return its visible text content."""
-    async with httpx.AsyncClient(
-        follow_redirects=True,
-        timeout=30.0,
-        headers={"User-Agent": _USER_AGENT},
-    ) as client:
-        response = await client.get(url)
+    """Fetch a web page and return its visible text content.
+
+    The body is streamed and the download stops after ``_MAX_PAGE_BYTES``, so
+    oversized pages are never held in memory in full.  Raises ``ValueError``
+    for non-HTML responses (PDFs, images, JSON) before reading the body.
+    """
+    client = _get_http_client()
+    async with _FETCH_SEM, client.stream("GET", url) as response:
         response.raise_for_status()
-    return extract_text(response.text, max_chars=max_chars)
+        content_type = response.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if content_type and content_type not in _HTML_CONTENT_TYPES:
+            raise ValueError(f"expected an HTML page, got {content_type!r}")
+        body = bytearray()
+        async for chunk in response.aiter_bytes(_READ_CHUNK_BYTES):
+            body += chunk
+            if len(body) >= _MAX_PAGE_BYTES:
+                break
+        encoding = response.charset_encoding or "utf-8"
+    try:
+        html = body.decode(encoding, errors="replace")
+    except LookupError:  # unknown charset label
+        html = body.decode("utf-8", errors="replace")
+    return extract_text(html, max_chars=max_chars)
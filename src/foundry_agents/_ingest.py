@@ -5,11 +5,15 @@ on ``foundry_agents_mcp``.
 """
 
 import asyncio
+import functools
 import logging
+from datetime import datetime, timezone
 
-from azure.search.documents import SearchClient
+from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
+    HnswParameters,
+    ScalarQuantizationCompression,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -21,16 +25,28 @@ from foundry_agents._client import (
     AZURE_AI_SEARCH_ENDPOINT,
     AZURE_AI_SEARCH_INDEX_NAME,
     AZURE_OPENAI_EMBEDDING_DIMENSIONS,
+    HNSW_EFC,
+    HNSW_EFS,
+    HNSW_M,
     build_document,
     embed,
-    get_credential,
+    embed_many,
+    get_index_client,
     get_search_client,
 )
 
 logger = logging.getLogger("foundry-agents")
 
+# Azure AI Search accepts at most 1000 actions per indexing request
+_MAX_UPLOAD_BATCH = 1000
 
+# Index names verified or created in this process; skips the per-call GET
+_INDEX_READY: set[str] = set()
+
+
+@functools.cache
 def _build_index_fields() -> list:
+    """Return the index field definitions (built once per process)."""
     return [
         SearchField(name="id", type=SearchFieldDataType.String, key=True, filterable=True),
         SearchField(name="title", type=SearchFieldDataType.String, searchable=True, filterable=True, sortable=True),
@@ -43,6 +59,8 @@ def _build_index_fields() -> list:
             type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
             vector_search_dimensions=AZURE_OPENAI_EMBEDDING_DIMENSIONS,
             vector_search_profile_name="hnsw-profile",
+            hidden=True,
+            stored=False,
         ),
         SearchField(name="project_name", type=SearchFieldDataType.String, searchable=True, filterable=True, facetable=True),
         SearchField(name="tags", type="Collection(Edm.String)", searchable=True, filterable=True, facetable=True),
@@ -55,30 +73,34 @@ def _build_index_fields() -> list:
 
 async def ensure_index() -> None:
     """Create the project-log index if it does not already exist."""
+    if AZURE_AI_SEARCH_INDEX_NAME in _INDEX_READY:
+        return
     if not AZURE_AI_SEARCH_ENDPOINT:
         raise RuntimeError("AZURE_AI_SEARCH_ENDPOINT is not configured")
 
-    from azure.core.exceptions import ResourceNotFoundError  # noqa: PLC0415
-    from azure.search.documents.indexes import SearchIndexClient  # noqa: PLC0415
-
-    index_client = SearchIndexClient(
-        endpoint=AZURE_AI_SEARCH_ENDPOINT,
-        credential=get_credential(),
-    )
+    index_client = get_index_client()
 
     try:
         await asyncio.to_thread(lambda: index_client.get_index(AZURE_AI_SEARCH_INDEX_NAME))
+        _INDEX_READY.add(AZURE_AI_SEARCH_INDEX_NAME)
         return  # already exists
     except ResourceNotFoundError:
         pass
 
     fields = _build_index_fields()
     vector_search = VectorSearch(
-        profiles=[VectorSearchProfile(name="hnsw-profile", algorithm_configuration_name="hnsw")],
-        algorithms=[HnswAlgorithmConfiguration(name="hnsw")],
+        profiles=[VectorSearchProfile(name="hnsw-profile", algorithm_configuration_name="hnsw", compression_name="sq")],
+        algorithms=[
+            HnswAlgorithmConfiguration(
+                name="hnsw",
+                parameters=HnswParameters(m=HNSW_M, ef_construction=HNSW_EFC, ef_search=HNSW_EFS, metric="cosine"),
+            )
+        ],
+        compressions=[ScalarQuantizationCompression(compression_name="sq")],
     )
     index = SearchIndex(name=AZURE_AI_SEARCH_INDEX_NAME, fields=fields, vector_search=vector_search)
     await asyncio.to_thread(lambda: index_client.create_or_update_index(index))
+    _INDEX_READY.add(AZURE_AI_SEARCH_INDEX_NAME)
     logger.info("Created index '%s'", AZURE_AI_SEARCH_INDEX_NAME)
 
 
@@ -93,14 +115,18 @@ async def ingest_document(
     tags: list[str] | None = None,
     reference_url: str = "",
     architecture: str = "",
+    context_vector: list[float] | None = None,
 ) -> str:
     """Embed *context*, build the document, and upload it to the search index.
 
-    Ensures the index exists first.  Returns the new document ID on success.
+    Ensures the index exists (concurrently with embedding).  Pass
+    *context_vector* when the embedding has already been computed.  Returns
+    the new document ID on success.
     """
-    await ensure_index()
-
-    context_vector = await embed(context)
+    if context_vector is None:
+        context_vector, _ = await asyncio.gather(embed(context), ensure_index())
+    else:
+        await ensure_index()
     doc = build_document(
         title=title,
         entry_type=entry_type,
@@ -114,16 +140,64 @@ async def ingest_document(
         architecture=architecture,
     )
 
-    # Always create a fresh client so the index name is correct
-    search_client = SearchClient(
-        endpoint=AZURE_AI_SEARCH_ENDPOINT,
-        index_name=AZURE_AI_SEARCH_INDEX_NAME,
-        credential=get_credential(),
-    )
+    search_client = get_search_client(AZURE_AI_SEARCH_INDEX_NAME)
     results = await asyncio.to_thread(
-        lambda: list(search_client.upload_documents(documents=[doc]))
+        lambda: search_client.upload_documents(documents=[doc])
     )
-    if not any(r.succeeded for r in results):
-        raise RuntimeError("Document upload failed for all results")
+    # One document in, one result out
+    if not (results and results[0].succeeded):
+        raise RuntimeError("Document upload failed")
 
     return doc["id"]
+
+
+async def ingest_documents(records: list[dict]) -> list[str]:
+    """Ingest several project-log entries with batched embedding and upload.
+
+    Contexts are embedded via :func:`embed_many` and documents are uploaded in
+    as few indexing requests as the service allows.  Each record takes the
+    same keyword arguments as :func:`ingest_document`.  Returns the IDs of
+    the documents that were indexed, in input order; failures are logged and
+    omitted, and an error is raised only if every document failed.
+    """
+    if not records:
+        return []
+    vectors, _ = await asyncio.gather(
+        embed_many([r["context"] for r in records]),
+        ensure_index(),
+    )
+    now = datetime.now(timezone.utc).isoformat()
+    docs = [
+        build_document(
+            title=r["title"],
+            entry_type=r["entry_type"],
+            customer_name=r["customer_name"],
+            short_summary=r["short_summary"],
+            context=r["context"],
+            context_vector=vector,
+            project_name=r.get("project_name", ""),
+            tags=r.get("tags"),
+            reference_url=r.get("reference_url", ""),
+            architecture=r.get("architecture", ""),
+            now=now,
+        )
+        for r, vector in zip(records, vectors)
+    ]
+
+    search_client = get_search_client(AZURE_AI_SEARCH_INDEX_NAME)
+    batches = [docs[i:i + _MAX_UPLOAD_BATCH] for i in range(0, len(docs), _MAX_UPLOAD_BATCH)]
+    results = [
+        r
+        for batch in batches
+        for r in await asyncio.to_thread(
+            lambda b=batch: list(search_client.upload_documents(documents=b))
+        )
+    ]
+    succeeded = {r.key for r in results if r.succeeded}
+    if not succeeded:
+        raise RuntimeError("Document upload failed for all results")
+    failed = [r.key for r in results if not r.succeeded]
+    if failed:
+        logger.warning("Upload failed for %d of %d documents: %s", len(failed), len(docs), failed)
+
+    return [doc["id"] for doc in docs if doc["id"] in succeeded]
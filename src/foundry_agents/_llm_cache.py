@@ -0,0 +1,270 @@
+"""Content-hash cache for agent (LLM) responses.
+
+Agent calls are pure functions of their input text, prompt version, and model,
+so re-processing the same customer story (retries, iterative development) can
+reuse the previous answer instead of paying for another completion.
+
+Backend selection via ``FOUNDRY_AGENTS_LLM_CACHE``:
+
+- ``memory`` (default) – per-process LRU dictionary
+- ``file``  – JSON files under ``~/.foundry_agents/cache/`` (survives restarts)
+- ``off``   – disable caching
+
+A second, opt-in semantic cache reuses results for near-duplicate pages (the
+same story re-published with minor edits at the same URL).  It compares the
+embedding of the page text against earlier pages from that URL and needs
+``numpy``; enable it by setting ``FOUNDRY_AGENTS_SEMANTIC_CACHE_THRESHOLD`` to a
+cosine similarity such as ``0.98``.  Entries persist to ``~/.foundry_agents/semcache.npz`` on exit.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from foundry_agents._client import embed
+
+logger = logging.getLogger("foundry-agents")
+
+LLM_CACHE_BACKEND: str = os.getenv("FOUNDRY_AGENTS_LLM_CACHE", "memory").lower()
+LLM_CACHE_DIR: Path = Path(
+    os.getenv("FOUNDRY_AGENTS_LLM_CACHE_DIR", str(Path.home() / ".foundry_agents" / "cache"))
+)
+DEFAULT_TTL_SECS: float = 7 * 86400
+SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("FOUNDRY_AGENTS_SEMANTIC_CACHE_THRESHOLD", "0"))
+SEMANTIC_CACHE_PATH: Path = Path(
+    os.getenv("FOUNDRY_AGENTS_SEMANTIC_CACHE_PATH", str(Path.home() / ".foundry_agents" / "semcache.npz"))
+)
+# Only the start of the page is embedded; it identifies the story well enough
+_SEMANTIC_KEY_CHARS: int = 8192
+# Entries held by the memory backend before the least recently used is evicted
+_MEMORY_CACHE_MAX: int = 512
+
+
+class LLMCache(Protocol):
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL_SECS) -> None: ...
+
+
+class MemoryLLMCache:
+    """In-process LRU cache of at most *max_entries*; entries expire after their TTL."""
+
+    def __init__(self, max_entries: int = _MEMORY_CACHE_MAX) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL_SECS) -> None:
+        now = time.time()
+        # TTLs vary per entry, so expiry order is not insertion order; scan them all
+        for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[stale]
+        self._entries[key] = (now + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class FileLLMCache:
+    """One JSON file per key under *directory*; entries expire after their TTL."""
+
+    def __init__(self, directory: Path) -> None:
+        self._dir = directory
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            entry = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL_SECS) -> None:
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_bytes(
+                orjson.dumps({"expires_at": time.time() + ttl, "value": value})
+            )
+        except OSError:
+            logger.warning("Could not write LLM cache entry to %s", self._dir, exc_info=True)
+
+
+class SemanticCache:
+    """Nearest-neighbour cache over unit-normalised embeddings, one matrix per kind.
+
+    Vectors are stored as float16 to halve memory; values are kept as JSON.
+    """
+
+    def __init__(self, path: Path, threshold: float) -> None:
+        self._path = path
+        self._threshold = threshold
+        self._vectors: dict[str, "np.ndarray"] = {}
+        self._values: dict[str, list[str]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with np.load(self._path) as data:
+                for name in data.files:
+                    kind, _, field = name.rpartition("__")
+                    if field == "vectors":
+                        self._vectors[kind] = data[name]
+                    elif field == "values":
+                        self._values[kind] = data[name].tolist()
+        except (OSError, ValueError):
+            return
+
+    @staticmethod
+    def _normalise(vector: list[float]) -> "np.ndarray":
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm else arr
+
+    def get(self, kind: str, vector: list[float]) -> Any | None:
+        matrix = self._vectors.get(kind)
+        if matrix is None or matrix.shape[1] != len(vector):
+            return None
+        sims = matrix @ self._normalise(vector)
+        best = int(sims.argmax())
+        if sims[best] < self._threshold:
+            return None
+        return orjson.loads(self._values[kind][best])
+
+    def add(self, kind: str, vector: list[float], value: Any) -> None:
+        row = self._normalise(vector).astype(np.float16)[np.newaxis, :]
+        matrix = self._vectors.get(kind)
+        if matrix is None or matrix.shape[1] != row.shape[1]:
+            self._vectors[kind] = row
+            self._values[kind] = []
+        else:
+            self._vectors[kind] = np.vstack([matrix, row])
+        self._values[kind].append(orjson.dumps(value).decode())
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        arrays = {}
+        for kind, matrix in self._vectors.items():
+            arrays[f"{kind}__vectors"] = matrix
+            arrays[f"{kind}__values"] = np.array(self._values[kind])
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("wb") as fh:
+                np.savez(fh, **arrays)
+            self._dirty = False
+        except OSError:
+            logger.warning("Could not write semantic cache to %s", self._path, exc_info=True)
+
+
+_cache: Optional[LLMCache] = None
+_semantic_cache: Optional[SemanticCache] = None
+_stats: dict[str, int] = {"hits": 0, "misses": 0, "semantic_hits": 0}
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the configured cache backend, or None when caching is disabled."""
+    global _cache
+    if _cache is None:
+        if LLM_CACHE_BACKEND == "off":
+            return None
+        _cache = FileLLMCache(LLM_CACHE_DIR) if LLM_CACHE_BACKEND == "file" else MemoryLLMCache()
+    return _cache
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the semantic cache, or None when disabled or numpy is missing."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        if SEMANTIC_CACHE_THRESHOLD <= 0 or np is None:
+            return None
+        _semantic_cache = SemanticCache(SEMANTIC_CACHE_PATH, SEMANTIC_CACHE_THRESHOLD)
+        atexit.register(_semantic_cache.save)
+    return _semantic_cache
+
+
+def make_key(kind: str, *parts: str, model: str = "") -> str:
+    """Build a cache key from the SHA-256 of *parts*, the model, and a prompt tag."""
+    digest = hashlib.sha256("\0".join((model, *parts)).encode()).hexdigest()
+    return f"{digest}:{kind}"
+
+
+async def cached_call(
+    key: str,
+    call: Callable[[], Awaitable[Any]],
+    ttl: float = DEFAULT_TTL_SECS,
+) -> Any:
+    """Return the cached value for *key*, or await *call* and cache its result."""
+    cache = get_cache()
+    if cache is None:
+        return await call()
+    value = cache.get(key)
+    if value is not None:
+        _stats["hits"] += 1
+        return value
+    _stats["misses"] += 1
+    value = await call()
+    cache.set(key, value, ttl=ttl)
+    return value
+
+
+async def semantic_cached_call(
+    kind: str,
+    text: str,
+    call: Callable[[], Awaitable[Any]],
+    *,
+    scope: str = "",
+) -> Any:
+    """Reuse the result of a near-duplicate *text*, or await *call* and remember it.
+
+    Only entries added with the same *scope* are candidates, so a result that
+    carries source-specific fields (e.g. a story's URL) is never handed to
+    another source.
+    """
+    semcache = get_semantic_cache()
+    if semcache is None:
+        return await call()
+    if scope:
+        kind = f"{kind}-{hashlib.sha256(scope.encode()).hexdigest()[:16]}"
+    vector = await embed(text[:_SEMANTIC_KEY_CHARS])
+    value = semcache.get(kind, vector)
+    if value is not None:
+        _stats["semantic_hits"] += 1
+        return value
+    value = await call()
+    semcache.add(kind, vector, value)
+    return value
+
+
+def cache_stats() -> dict[str, int]:
+    """Return hit/miss counters (exact and semantic) for this process."""
+    return dict(_stats)
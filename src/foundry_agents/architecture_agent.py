@@ -17,17 +17,24 @@ otherwise it falls back to a direct Azure OpenAI chat-completion call.
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
 
+from pydantic import BaseModel, Field
+
 from foundry_agents._client import (
     AZURE_OPENAI_COMPLETION_MODEL_NAME,
     get_chat_client,
     get_project_client,
+    structured_completion,
+)
+from foundry_agents._foundry import (
+    find_agent_by_name,
+    invalidate_agent_cache,
+    invoke_and_wait,
+    list_agents_cached,
 )
-from foundry_agents._foundry import find_agent_by_name, invoke_and_wait
 
 logger = logging.getLogger("foundry-agents")
 
@@ -69,6 +76,27 @@ extra text.
 """
 
 
+class _Component(BaseModel):
+    name: str
+    type: str
+    description: str
+
+
+class _Connection(BaseModel):
+    from_: str = Field(alias="from")
+    to: str
+    description: str
+
+
+class ArchitectureSchema(BaseModel):
+    """Structured-output schema mirroring the JSON described in ``INSTRUCTIONS``."""
+
+    diagram_type: str
+    components: list[_Component]
+    connections: list[_Connection]
+    patterns: list[str]
+
+
 # ── Deploy ────────────────────────────────────────────────────────────────────
 
 async def deploy(project_client=None) -> str:
@@ -90,7 +118,8 @@ async def deploy(project_client=None) -> str:
             "Set this environment variable to your chat model deployment name."
         )
 
-    existing = await find_agent_by_name(pc, AGENT_NAME)
+    agents = await list_agents_cached(pc)
+    existing = next((a for a in agents if getattr(a, "name", None) == AGENT_NAME), None)
 
     if existing:
         agent = await asyncio.to_thread(
@@ -114,6 +143,7 @@ async def deploy(project_client=None) -> str:
         )
         print(f"Created {AGENT_NAME} (ID: {agent.id})")
 
+    invalidate_agent_cache(pc, AGENT_NAME)
     return agent.id
 
 
@@ -150,8 +180,8 @@ async def run(
         if foundry_agent:
             logger.info("Using deployed Foundry agent %s (%s)", AGENT_NAME, foundry_agent.id)
             raw = await invoke_and_wait(pc, foundry_agent.id, user_message)
-            # Validate JSON before returning
-            json.loads(raw)
+            # Parse and check against the schema in one pass before storing it
+            ArchitectureSchema.model_validate_json(raw)
             return raw
 
     # ── Fallback: direct Azure OpenAI inference ────────────────────────────────
@@ -163,20 +193,12 @@ async def run(
         )
 
     logger.info("Deployed agent not found; using direct inference for %s", AGENT_NAME)
-    response = await asyncio.to_thread(
-        lambda: cc.chat.completions.create(
-            model=AZURE_OPENAI_COMPLETION_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": INSTRUCTIONS},
-                {"role": "user", "content": user_message},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3,
-        )
-    )
-    raw = response.choices[0].message.content or "{}"
-    json.loads(raw)  # validate
-    return raw
+    # Structured outputs: the service guarantees JSON matching the schema, so
+    # the content is already the string to store.
+    message = await structured_completion(cc, ArchitectureSchema, INSTRUCTIONS, user_message, temperature=0.3)
+    if not message.get("content"):
+        raise RuntimeError(f"{AGENT_NAME} returned no architecture: {message.get('refusal') or 'empty response'}")
+    return message["content"]
 
 
 # ── CLI entry point ───────────────────────────────────────────────────────────
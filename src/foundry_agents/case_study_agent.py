@@ -18,17 +18,25 @@ otherwise it falls back to a direct Azure OpenAI chat-completion call.
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
 
+import orjson
+from pydantic import BaseModel
+
 from foundry_agents._client import (
     AZURE_OPENAI_COMPLETION_MODEL_NAME,
     get_chat_client,
     get_project_client,
+    structured_completion,
+)
+from foundry_agents._foundry import (
+    find_agent_by_name,
+    invalidate_agent_cache,
+    invoke_and_wait,
+    list_agents_cached,
 )
-from foundry_agents._foundry import find_agent_by_name, invoke_and_wait
 
 logger = logging.getLogger("foundry-agents")
 
@@ -57,6 +65,17 @@ no explanations, and no extra text.
 """
 
 
+class CaseStudySchema(BaseModel):
+    """Structured-output schema mirroring the JSON described in ``INSTRUCTIONS``."""
+
+    title: str
+    customer_name: str
+    short_summary: str
+    context: str
+    tags: list[str]
+    reference_url: str
+
+
 # ── Deploy ────────────────────────────────────────────────────────────────────
 
 async def deploy(project_client=None) -> str:
@@ -79,7 +98,8 @@ async def deploy(project_client=None) -> str:
             "Set this environment variable to your chat model deployment name."
         )
 
-    existing = await find_agent_by_name(pc, AGENT_NAME)
+    agents = await list_agents_cached(pc)
+    existing = next((a for a in agents if getattr(a, "name", None) == AGENT_NAME), None)
 
     if existing:
         agent = await asyncio.to_thread(
@@ -103,6 +123,7 @@ async def deploy(project_client=None) -> str:
         )
         print(f"Created {AGENT_NAME} (ID: {agent.id})")
 
+    invalidate_agent_cache(pc, AGENT_NAME)
     return agent.id
 
 
@@ -134,7 +155,8 @@ async def run(
         if foundry_agent:
             logger.info("Using deployed Foundry agent %s (%s)", AGENT_NAME, foundry_agent.id)
             raw = await invoke_and_wait(pc, foundry_agent.id, user_message)
-            return json.loads(raw)
+            # Same shape as the structured-output path below
+            return CaseStudySchema.model_validate_json(raw).model_dump()
 
     # ── Fallback: direct Azure OpenAI inference ────────────────────────────────
     cc = chat_client or get_chat_client()
@@ -145,18 +167,12 @@ async def run(
         )
 
     logger.info("Deployed agent not found; using direct inference for %s", AGENT_NAME)
-    response = await asyncio.to_thread(
-        lambda: cc.chat.completions.create(
-            model=AZURE_OPENAI_COMPLETION_MODEL_NAME,
-            messages=[
-                {"role": "system", "content": INSTRUCTIONS},
-                {"role": "user", "content": user_message},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.1,
-        )
-    )
-    return json.loads(response.choices[0].message.content or "{}")
+    # Structured outputs: the service guarantees JSON matching the schema, so
+    # the content is decoded straight to a dict without re-validation.
+    message = await structured_completion(cc, CaseStudySchema, INSTRUCTIONS, user_message, temperature=0.1)
+    if not message.get("content"):
+        raise RuntimeError(f"{AGENT_NAME} returned no case study: {message.get('refusal') or 'empty response'}")
+    return orjson.loads(message["content"])
 
 
 # ── CLI entry point ───────────────────────────────────────────────────────────
@@ -2,36 +2,161 @@
 
 Run from the command line::
 
-    run-project-log-workflow --url <story_url> [--project <project_name>]
+    run-project-log-workflow --url <story_url> [--url <story_url> ...] [--project <project_name>]
+
+Deploy both agents used by the pipeline in one go::
+
+    deploy-project-log-agents
 
 Or call :func:`run_pipeline` directly from Python (e.g. from the MCP server's
-``workflows_run_project_log_workflow`` tool).
+``workflows_run_project_log_workflow`` tool), or :func:`run_pipelines` to
+process several story URLs concurrently.
 
 Pipeline
 --------
 1. **Fetch** – Download and extract text from the customer story URL.
 2. **CaseStudyAgent** – Extract structured metadata (title, customer, summary,
-   context, tags, URL).  Uses the deployed Foundry agent when available;
-   falls back to direct Azure OpenAI inference.
+   context, tags, URL).
 3. **ArchitectureAgent** – Generate a JSON architecture diagram from the case
-   study context and technology tags.  Same fallback logic.
+   study context and technology tags.
+
+   When both agents are deployed in Foundry they are invoked one after the
+   other.  Otherwise steps 2 and 3 are answered by a single direct Azure
+   OpenAI chat completion (:func:`run_combined`), so the page text is sent
+   and tokenized only once.
 4. **Ingest** – Upload the combined entry to the Azure AI Search project-log
    index (auto-creates the index if needed).
 """
 
 import asyncio
-import json
 import logging
 import sys
 from typing import Optional
 
-from foundry_agents._html import fetch_page_text
-from foundry_agents._ingest import ingest_document
+import orjson
+from pydantic import BaseModel
+
+from foundry_agents import architecture_agent, case_study_agent
+from foundry_agents._client import (
+    AZURE_OPENAI_COMPLETION_MODEL_NAME,
+    embed,
+    get_chat_client,
+    get_project_client,
+    structured_completion,
+    warmup,
+)
+from foundry_agents._foundry import find_agent_by_name
+from foundry_agents._html import close_http_client, fetch_page_text
+from foundry_agents._ingest import ensure_index, ingest_document
+from foundry_agents._llm_cache import cached_call, make_key, semantic_cached_call
+from foundry_agents.architecture_agent import ArchitectureSchema
+from foundry_agents.architecture_agent import deploy as deploy_architecture
 from foundry_agents.architecture_agent import run as run_architecture
+from foundry_agents.case_study_agent import CaseStudySchema
+from foundry_agents.case_study_agent import deploy as deploy_case_study
 from foundry_agents.case_study_agent import run as run_case_study
 
 logger = logging.getLogger("foundry-agents")
 
+# Last line of the status string returned by a fully successful run_pipeline
+SUCCESS_MESSAGE = "✅ Project-log workflow completed successfully."
+# Last line when the entry was handed to a background ingest (background_ingest=True)
+QUEUED_MESSAGE = "✅ Project-log workflow completed; the entry is being ingested in the background."
+
+# Less visible text than this is an empty page, a bot challenge, or a redirect
+# stub rather than a customer story; not worth an agent call.
+_MIN_PAGE_CHARS = 500
+
+COMBINED_INSTRUCTIONS = f"""\
+You perform two tasks on the text of a Microsoft customer success story and
+return ONE JSON object with exactly two keys, "case_study" and "architecture".
+
+Task 1 – "case_study":
+{case_study_agent.INSTRUCTIONS}
+Task 2 – "architecture": using the title, customer name, context, and tags you
+extracted in task 1 as input:
+{architecture_agent.INSTRUCTIONS}"""
+
+
+# Background ingests started by run_pipeline(background_ingest=True), keyed by
+# task (strong references keep them alive) with the story URL as the value
+_ingest_tasks: dict[asyncio.Task, str] = {}
+# story_url -> error, when the latest background ingest of that URL failed
+_ingest_failures: dict[str, str] = {}
+_MAX_INGEST_FAILURES = 50
+
+
+def _on_ingest_done(task: asyncio.Task) -> None:
+    story_url = _ingest_tasks.pop(task, "")
+    if task.cancelled():
+        error = "cancelled"
+    elif task.exception() is not None:
+        logger.error("Background ingest of %s failed", story_url, exc_info=task.exception())
+        error = str(task.exception())
+    else:
+        logger.info("Background ingest of %s stored as %s", story_url, task.result())
+        return
+    if len(_ingest_failures) >= _MAX_INGEST_FAILURES:
+        del _ingest_failures[next(iter(_ingest_failures))]
+    _ingest_failures[story_url] = error
+
+
+def ingest_status() -> tuple[list[str], dict[str, str]]:
+    """Return the story URLs still being ingested and ``{url: error}`` for failed ones."""
+    return list(_ingest_tasks.values()), dict(_ingest_failures)
+
+
+async def wait_for_ingests() -> None:
+    """Wait for every background ingest to finish (call before closing clients)."""
+    if _ingest_tasks:
+        await asyncio.gather(*_ingest_tasks, return_exceptions=True)
+
+
+class _CombinedSchema(BaseModel):
+    case_study: CaseStudySchema
+    architecture: ArchitectureSchema
+
+
+async def run_combined(
+    page_text: str,
+    reference_url: str = "",
+    *,
+    chat_client=None,
+) -> tuple[dict, str]:
+    """Run CaseStudyAgent and ArchitectureAgent as one chat completion.
+
+    Returns ``(case_study, architecture_json)`` in the same shapes as
+    :func:`foundry_agents.case_study_agent.run` and
+    :func:`foundry_agents.architecture_agent.run`.
+    """
+    cc = chat_client or get_chat_client()
+    if cc is None:
+        raise RuntimeError(
+            "AZURE_OPENAI_COMPLETION_MODEL_NAME is not configured. "
+            "Set it, or deploy the agents with `deploy-project-log-agents`."
+        )
+
+    user_message = f"Reference URL: {reference_url}\n\nPage content:\n{page_text}"
+    message = await structured_completion(
+        cc, _CombinedSchema, COMBINED_INSTRUCTIONS, user_message, temperature=0.1
+    )
+    if not message.get("content"):
+        raise RuntimeError(f"Combined agent call returned no result: {message.get('refusal') or 'empty response'}")
+    result = orjson.loads(message["content"])
+    return result["case_study"], orjson.dumps(result["architecture"]).decode()
+
+
+async def _foundry_agents_deployed(project_client=None) -> bool:
+    """Return True when both pipeline agents are deployed in the Foundry project."""
+    pc = project_client or get_project_client()
+    if pc is None:
+        return False
+    agents = await asyncio.gather(
+        find_agent_by_name(pc, case_study_agent.AGENT_NAME),
+        find_agent_by_name(pc, architecture_agent.AGENT_NAME),
+    )
+    return all(agents)
+
 
 async def run_pipeline(
     story_url: str,
@@ -39,6 +164,7 @@ async def run_pipeline(
     *,
     project_client=None,
     chat_client=None,
+    background_ingest: bool = False,
 ) -> str:
     """Execute the full project-log ingestion pipeline.
 
@@ -51,8 +177,12 @@ async def run_pipeline(
     project_client:
         Pre-constructed ``AIProjectClient``; created from env vars if omitted.
     chat_client:
-        Pre-constructed ``AzureOpenAI`` chat client; created from env vars if
+        Pre-constructed ``AsyncAzureOpenAI`` chat client; created from env vars if
         omitted (used for the direct-inference fallback path).
+    background_ingest:
+        Return as soon as the entry is ready and upload it in a background
+        task (see :func:`ingest_status` / :func:`wait_for_ingests`).  The
+        event loop must stay alive until the upload completes.
 
     Returns
     -------
@@ -68,22 +198,60 @@ async def run_pipeline(
         page_text = await fetch_page_text(story_url)
     except Exception as exc:
         logger.exception("run_pipeline – page fetch failed")
-        return "\n".join(lines) + f"\n❌ Failed to fetch `{story_url}`: {exc}"
+        lines.append(f"❌ Failed to fetch `{story_url}`: {exc}")
+        return "\n".join(lines)
+
+    if len(page_text) < _MIN_PAGE_CHARS:
+        lines.append(
+            f"❌ Only {len(page_text):,} characters of text found at `{story_url}`; "
+            "this does not look like a customer story page."
+        )
+        return "\n".join(lines)
 
     lines.append(f"Fetched {len(page_text):,} characters from `{story_url}`.\n")
 
-    # ── Step 2: CaseStudyAgent ────────────────────────────────────────────────
-    lines.append("### Step 2: CaseStudyAgent – extracting metadata…\n")
+    # Bootstrap the search index while the agents run; it is only needed at Step 4
+    index_task = asyncio.create_task(ensure_index())
+
+    # ── Step 2: CaseStudyAgent (combined with Step 3 unless both are deployed) ─
     try:
-        case_study = await run_case_study(
-            page_text,
-            story_url,
-            project_client=project_client,
-            chat_client=chat_client,
-        )
+        # Inside the try so a failed lookup is reported and index_task is cancelled
+        combined = not await _foundry_agents_deployed(project_client)
+        if combined:
+            lines.append("### Step 2: CaseStudyAgent + ArchitectureAgent – single combined call…\n")
+        else:
+            lines.append("### Step 2: CaseStudyAgent – extracting metadata…\n")
+        if combined:
+            case_study, architecture_json = await cached_call(
+                make_key("combined:v1", page_text, story_url, model=AZURE_OPENAI_COMPLETION_MODEL_NAME),
+                lambda: semantic_cached_call(
+                    "combined",
+                    page_text,
+                    lambda: run_combined(page_text, story_url, chat_client=chat_client),
+                    scope=story_url,
+                ),
+            )
+        else:
+            case_study = await cached_call(
+                make_key("cs:v1", page_text, story_url, model=AZURE_OPENAI_COMPLETION_MODEL_NAME),
+                lambda: semantic_cached_call(
+                    "cs",
+                    page_text,
+                    lambda: run_case_study(
+                        page_text,
+                        story_url,
+                        project_client=project_client,
+                        chat_client=chat_client,
+                    ),
+                    scope=story_url,
+                ),
+            )
     except Exception as exc:
         logger.exception("run_pipeline – CaseStudyAgent failed")
-        return "\n".join(lines) + f"\n❌ CaseStudyAgent failed: {exc}"
+        index_task.cancel()
+        await asyncio.gather(index_task, return_exceptions=True)
+        lines.append(f"❌ CaseStudyAgent failed: {exc}")
+        return "\n".join(lines)
 
     title: str = case_study.get("title", "Untitled Customer Story")
     customer_name: str = case_study.get("customer_name", "")
@@ -97,30 +265,51 @@ async def run_pipeline(
     lines.append(f"- **Tags**: {', '.join(tags)}")
     lines.append(f"- **Summary**: {short_summary}\n")
 
+    # Embed the context while ArchitectureAgent runs; both only need Step 2 output
+    embed_task = asyncio.create_task(embed(context))
+
     # ── Step 3: ArchitectureAgent ─────────────────────────────────────────────
     lines.append("### Step 3: ArchitectureAgent – generating architecture diagram…\n")
     try:
-        architecture_json = await run_architecture(
-            title,
-            customer_name,
-            context,
-            tags,
-            project_client=project_client,
-            chat_client=chat_client,
-        )
-        arch_data = json.loads(architecture_json)
+        if not combined:
+            architecture_json = await cached_call(
+                make_key(
+                    "arch:v1",
+                    title,
+                    customer_name,
+                    context,
+                    ",".join(tags),
+                    model=AZURE_OPENAI_COMPLETION_MODEL_NAME,
+                ),
+                lambda: run_architecture(
+                    title,
+                    customer_name,
+                    context,
+                    tags,
+                    project_client=project_client,
+                    chat_client=chat_client,
+                ),
+            )
+        arch_data = orjson.loads(architecture_json)
         component_names = [c.get("name", "") for c in arch_data.get("components", [])]
         lines.append(f"- **Components** ({len(component_names)}): {', '.join(component_names[:6])}")
         lines.append(f"- **Patterns**: {', '.join(arch_data.get('patterns', []))}\n")
     except Exception as exc:
         logger.exception("run_pipeline – ArchitectureAgent failed")
-        architecture_json = json.dumps({"error": str(exc)})
+        architecture_json = ""
         lines.append(f"⚠️ Architecture generation failed: {exc}. Storing empty diagram.\n")
 
     # ── Step 4: Ingest ────────────────────────────────────────────────────────
     lines.append("### Step 4: Ingesting into project-log vector index…\n")
-    try:
-        doc_id = await ingest_document(
+
+    async def _ingest() -> str:
+        index_result, context_vector = await asyncio.gather(
+            index_task, embed_task, return_exceptions=True
+        )
+        for result in (index_result, context_vector):
+            if isinstance(result, BaseException):
+                raise result
+        return await ingest_document(
             title=title,
             entry_type="blog",
             customer_name=customer_name,
@@ -130,10 +319,29 @@ async def run_pipeline(
             tags=tags,
             reference_url=reference_url,
             architecture=architecture_json,
+            context_vector=context_vector,
         )
+
+    if background_ingest:
+        # A new attempt supersedes any earlier failure for this URL
+        _ingest_failures.pop(story_url, None)
+        task = asyncio.create_task(_ingest())
+        _ingest_tasks[task] = story_url
+        task.add_done_callback(_on_ingest_done)
+        lines.append(
+            "Ingestion queued.\n"
+            f"- **Title**: {title}\n"
+            f"- **Customer**: {customer_name}"
+        )
+        lines.append(f"\n{QUEUED_MESSAGE}")
+        return "\n".join(lines)
+
+    try:
+        doc_id = await _ingest()
     except Exception as exc:
         logger.exception("run_pipeline – ingestion failed")
-        return "\n".join(lines) + f"\n❌ Ingestion failed: {exc}"
+        lines.append(f"❌ Ingestion failed: {exc}")
+        return "\n".join(lines)
 
     lines.append(
         "Project log ingested successfully.\n"
@@ -141,10 +349,39 @@ async def run_pipeline(
         f"- **Title**: {title}\n"
         f"- **Customer**: {customer_name}"
     )
-    lines.append("\n✅ Project-log workflow completed successfully.")
+    lines.append(f"\n{SUCCESS_MESSAGE}")
     return "\n".join(lines)
 
 
+async def run_pipelines(
+    story_urls: list[str],
+    project_name: str = "",
+    *,
+    max_concurrent: int = 8,
+    project_client=None,
+    chat_client=None,
+) -> list[str]:
+    """Run :func:`run_pipeline` for several story URLs concurrently.
+
+    At most *max_concurrent* pipelines are in flight at once so the fetch,
+    agent, and ingest legs of different URLs overlap without flooding the
+    Azure OpenAI or Azure AI Search quotas.  Returns one status string per URL,
+    in input order.
+    """
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def _process_one(url: str) -> str:
+        async with sem:
+            return await run_pipeline(
+                url,
+                project_name,
+                project_client=project_client,
+                chat_client=chat_client,
+            )
+
+    return await asyncio.gather(*(_process_one(url) for url in story_urls))
+
+
 # ── CLI entry point ───────────────────────────────────────────────────────────
 
 def run_cmd() -> None:
@@ -168,9 +405,11 @@ def run_cmd() -> None:
     parser.add_argument(
         "--url",
         required=True,
+        action="append",
         metavar="URL",
         help=(
-            "URL of a Microsoft customer success story, e.g. "
+            "URL of a Microsoft customer success story; repeat to process "
+            "several stories concurrently, e.g. "
             "https://www.microsoft.com/en/customers/story/25676-commerzbank-ag-azure-ai-foundry-agent-service"
         ),
     )
@@ -194,9 +433,48 @@ def run_cmd() -> None:
             stream=sys.stderr,
         )
 
+    async def _main() -> str:
+        try:
+            await warmup()
+            results = await run_pipelines(args.url, args.project)
+            return "\n\n".join(results)
+        finally:
+            await close_http_client()
+
     try:
-        result = asyncio.run(run_pipeline(args.url, args.project))
+        result = asyncio.run(_main())
         print(result)
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
         sys.exit(1)
+
+
+def deploy_agents_cmd() -> None:
+    """Entry point for the ``deploy-project-log-agents`` CLI command."""
+    import argparse  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog="deploy-project-log-agents",
+        description=(
+            "Deploy CaseStudyAgent and ArchitectureAgent to your Azure AI "
+            "Foundry project concurrently.\n\n"
+            "Required env vars: AZURE_AI_PROJECT_ENDPOINT, "
+            "AZURE_OPENAI_COMPLETION_MODEL_NAME"
+        ),
+    )
+    parser.parse_args()
+
+    async def _deploy_all() -> list[str]:
+        # Both deploys share one list_agents call via list_agents_cached
+        return await asyncio.gather(deploy_case_study(), deploy_architecture())
+
+    try:
+        agent_ids = asyncio.run(_deploy_all())
+        print(f"\nAgent IDs: {', '.join(agent_ids)}")
+        print(
+            "\nThe agents are now available in your Foundry project.\n"
+            "Use `agents_list_agents` in the MCP server to verify."
+        )
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
@@ -1,13 +1,24 @@
 """MCP tools for the **agents_*** namespace.
 
 Covers the full Azure AI Foundry agent/workflow lifecycle:
-list → invoke → poll status → retrieve results.
+list → invoke → poll status → retrieve results (or wait for them in one call).
 """
 
 import asyncio
-import json
+import random
 from typing import Optional
 
+import orjson
+
+try:
+    from azure.ai.agents.models import (
+        AgentThreadCreationOptions,
+        ListSortOrder,
+        ThreadMessageOptions,
+    )
+except ImportError:  # pragma: no cover - ships with azure-ai-projects
+    AgentThreadCreationOptions = ListSortOrder = ThreadMessageOptions = None
+
 from foundry_agents_mcp.app import mcp
 from foundry_agents_mcp.client import (
     _get_project_client,
@@ -16,6 +27,44 @@ from foundry_agents_mcp.client import (
     logger,
 )
 
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled", "expired"})
+_WAIT_POLL_INITIAL_SECS = 0.1
+_WAIT_POLL_MAX_SECS = 2.0
+
+
+def _format_agent(agent) -> str:
+    """Render one agent as a Markdown block (terminated by a blank line)."""
+    lines = [
+        f"### {getattr(agent, 'name', None) or 'Unnamed Agent'}",
+        f"- **ID**: `{agent.id}`",
+        f"- **Model**: {getattr(agent, 'model', 'N/A')}",
+    ]
+    description = getattr(agent, "description", None)
+    if description:
+        lines.append(f"- **Description**: {description}")
+    tools = getattr(agent, "tools", None) or []
+    if tools:
+        tool_types = [getattr(t, "type", str(t)) for t in tools]
+        lines.append(f"- **Tools**: {', '.join(tool_types)}")
+    metadata = getattr(agent, "metadata", None) or {}
+    if metadata:
+        lines.append(f"- **Metadata**: {orjson.dumps(metadata).decode()}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _list_agents_markdown(project_client) -> str:
+    """List and format all agents (blocking); returns "" when there are none.
+
+    Pagination and attribute access both happen on the calling thread, so
+    lazy SDK objects never trigger network I/O on the event loop.
+    """
+    lines = ["## Available Agents and Workflows\n"]
+    lines.extend(map(_format_agent, project_client.agents.list_agents()))
+    if len(lines) == 1:
+        return ""
+    return "\n".join(lines)
+
 
 @mcp.tool()
 async def agents_list_agents() -> str:
@@ -37,28 +86,8 @@ async def agents_list_agents() -> str:
         )
 
     try:
-        agents = await asyncio.to_thread(lambda: list(project_client.agents.list_agents()))
-        if not agents:
-            return "No agents are currently available in the project."
-
-        lines = ["## Available Agents and Workflows\n"]
-        for agent in agents:
-            lines.append(f"### {getattr(agent, 'name', None) or 'Unnamed Agent'}")
-            lines.append(f"- **ID**: `{agent.id}`")
-            lines.append(f"- **Model**: {getattr(agent, 'model', 'N/A')}")
-            description = getattr(agent, "description", None)
-            if description:
-                lines.append(f"- **Description**: {description}")
-            tools = getattr(agent, "tools", None) or []
-            if tools:
-                tool_types = [getattr(t, "type", str(t)) for t in tools]
-                lines.append(f"- **Tools**: {', '.join(tool_types)}")
-            metadata = getattr(agent, "metadata", None) or {}
-            if metadata:
-                lines.append(f"- **Metadata**: {json.dumps(metadata)}")
-            lines.append("")
-
-        return "\n".join(lines)
+        text = await asyncio.to_thread(_list_agents_markdown, project_client)
+        return text or "No agents are currently available in the project."
 
     except Exception as exc:
         logger.exception("agents_list_agents failed")
@@ -92,11 +121,6 @@ async def agents_invoke_agent(
         return "Error: AZURE_AI_PROJECT_ENDPOINT is not configured."
 
     try:
-        from azure.ai.agents.models import (  # noqa: PLC0415
-            AgentThreadCreationOptions,
-            ThreadMessageOptions,
-        )
-
         content = task
         if file_context:
             content = f"{task}\n\nAdditional context:\n{file_context}"
@@ -165,8 +189,7 @@ async def agents_get_invocation_status(invocation_id: str) -> str:
         if getattr(run, "last_error", None):
             lines.append(f"- **Error**: {run.last_error}")
 
-        terminal = {"completed", "failed", "cancelled", "expired"}
-        if str(run.status) in terminal:
+        if run.status in _TERMINAL_STATUSES:
             lines.append(
                 "\nInvocation has finished. "
                 "Use `agents_get_invocation_result` to retrieve results."
@@ -181,6 +204,54 @@ async def agents_get_invocation_status(invocation_id: str) -> str:
         return f"Error getting status for '{invocation_id}': {exc}"
 
 
+def _latest_assistant_message(project_client, thread_id: str):
+    """Return the newest assistant message on *thread_id* (blocking), or None.
+
+    The pager is consumed here so page fetches stay off the event loop.
+    """
+    messages = project_client.agents.list_messages(
+        thread_id=thread_id,
+        order=ListSortOrder.DESCENDING,
+        # Only the newest assistant message is needed; keep to one small page
+        limit=5,
+    )
+    return next((msg for msg in messages if getattr(msg, "role", "") == "assistant"), None)
+
+
+async def _invocation_result(project_client, invocation_id: str, thread_id: str, run) -> str:
+    """Render the outcome of a finished run as Markdown."""
+    status = getattr(run.status, "value", run.status)
+    if status == "failed":
+        err = getattr(run, "last_error", None)
+        msg = getattr(err, "message", str(err)) if err else "Unknown error"
+        return f"Invocation **failed**: {msg}"
+
+    if status in ("cancelled", "expired"):
+        return f"Invocation was **{status}**."
+
+    msg = await asyncio.to_thread(_latest_assistant_message, project_client, thread_id)
+
+    lines = [
+        "## Invocation Result\n",
+        f"- **Invocation ID**: `{invocation_id}`\n",
+        "### Response\n",
+    ]
+
+    if msg is None:
+        lines.append("No assistant response found.")
+    else:
+        for part in getattr(msg, "content", []):
+            text_obj = getattr(part, "text", None)
+            if text_obj is not None:
+                lines.append(getattr(text_obj, "value", str(text_obj)))
+            image_obj = getattr(part, "image_file", None)
+            if image_obj is not None:
+                file_id = getattr(image_obj, "file_id", "unknown")
+                lines.append(f"[Image file: {file_id}]")
+
+    return "\n".join(lines)
+
+
 @mcp.tool()
 async def agents_get_invocation_result(invocation_id: str) -> str:
     """Retrieve the text or file results from a completed agent or workflow invocation.
@@ -209,56 +280,66 @@ async def agents_get_invocation_result(invocation_id: str) -> str:
             lambda: project_client.agents.get_run(thread_id=thread_id, run_id=run_id)
         )
 
-        status = str(run.status)
-        terminal = {"completed", "failed", "cancelled", "expired"}
-        if status not in terminal:
+        if run.status not in _TERMINAL_STATUSES:
             return (
-                f"Invocation is not complete yet. Current status: **{status}**\n"
+                "Invocation is not complete yet. Current status: "
+                f"**{getattr(run.status, 'value', run.status)}**\n"
                 "Use `agents_get_invocation_status` to monitor progress."
             )
 
-        if status == "failed":
-            err = getattr(run, "last_error", None)
-            msg = getattr(err, "message", str(err)) if err else "Unknown error"
-            return f"Invocation **failed**: {msg}"
+        return await _invocation_result(project_client, invocation_id, thread_id, run)
 
-        if status in ("cancelled", "expired"):
-            return f"Invocation was **{status}**."
+    except Exception as exc:
+        logger.exception("agents_get_invocation_result failed")
+        return f"Error retrieving result for '{invocation_id}': {exc}"
 
-        from azure.ai.agents.models import ListSortOrder  # noqa: PLC0415
 
-        messages = await asyncio.to_thread(
-            lambda: project_client.agents.list_messages(
-                thread_id=thread_id,
-                order=ListSortOrder.DESCENDING,
-            )
-        )
+@mcp.tool()
+async def agents_wait_and_get_result(invocation_id: str, timeout_s: int = 300) -> str:
+    """Wait for an agent or workflow invocation to finish and return its result.
 
-        lines = [
-            "## Invocation Result\n",
-            f"- **Invocation ID**: `{invocation_id}`\n",
-            "### Response\n",
-        ]
+    Polls the run server-side with exponential backoff, so a single call
+    replaces the status → result polling loop.
 
-        found = False
-        for msg in messages:
-            if str(getattr(msg, "role", "")) == "assistant":
-                found = True
-                for part in getattr(msg, "content", []):
-                    text_obj = getattr(part, "text", None)
-                    if text_obj is not None:
-                        lines.append(getattr(text_obj, "value", str(text_obj)))
-                    image_obj = getattr(part, "image_file", None)
-                    if image_obj is not None:
-                        file_id = getattr(image_obj, "file_id", "unknown")
-                        lines.append(f"[Image file: {file_id}]")
-                break  # most recent assistant message only
-
-        if not found:
-            lines.append("No assistant response found.")
+    Args:
+        invocation_id: The invocation ID returned by agents_invoke_agent.
+        timeout_s: Maximum number of seconds to wait (default: 300).
 
-        return "\n".join(lines)
+    Example prompts:
+    - "Wait for invocation <invocation_id> and show me the result"
+    - "Block until the workflow <invocation_id> is done, then return its output"
+    """
+    project_client = _get_project_client()
+    if project_client is None:
+        return "Error: AZURE_AI_PROJECT_ENDPOINT is not configured."
+
+    try:
+        thread_id, run_id = _parse_invocation_id(invocation_id)
+    except ValueError as exc:
+        return str(exc)
+
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        delay = _WAIT_POLL_INITIAL_SECS
+        while True:
+            run = await asyncio.to_thread(
+                lambda: project_client.agents.get_run(thread_id=thread_id, run_id=run_id)
+            )
+            if run.status in _TERMINAL_STATUSES:
+                return await _invocation_result(project_client, invocation_id, thread_id, run)
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return (
+                    f"Invocation did not finish within {timeout_s}s. Current status: "
+                    f"**{getattr(run.status, 'value', run.status)}**\n"
+                    "Call `agents_wait_and_get_result` again to keep waiting."
+                )
+            # Jitter spreads out polls from many concurrent waiters
+            await asyncio.sleep(min(delay * random.uniform(0.8, 1.2), remaining))
+            delay = min(delay * 1.5, _WAIT_POLL_MAX_SECS)
 
     except Exception as exc:
-        logger.exception("agents_get_invocation_result failed")
-        return f"Error retrieving result for '{invocation_id}': {exc}"
+        logger.exception("agents_wait_and_get_result failed")
+        return f"Error waiting for '{invocation_id}': {exc}"
@@ -1,5 +1,37 @@
 """Shared FastMCP application instance for the Foundry Agents MCP Server."""
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastmcp import FastMCP
 
-mcp = FastMCP("foundry-agents-mcp-server")
+from foundry_agents._client import warmup as warmup_workflow_clients
+from foundry_agents._html import close_http_client
+from foundry_agents.project_log_workflow import wait_for_ingests
+from foundry_agents_mcp.client import close_clients, warmup
+
+
+async def _warmup_all() -> None:
+    # The workflow tool runs on the foundry_agents clients, the rest on ours
+    await asyncio.gather(warmup(), warmup_workflow_clients())
+
+
+@asynccontextmanager
+async def _lifespan(_server):
+    # Build the Azure clients and fetch tokens in the background, so the MCP
+    # handshake does not wait for them but the first tool call finds them warm
+    warm_task = asyncio.create_task(_warmup_all())
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_task
+        # Workflow runs hand their index upload to a background task
+        await wait_for_ingests()
+        await close_clients()
+        # The page-fetch pool used by the project-log workflow tool
+        await close_http_client()
+
+
+mcp = FastMCP("foundry-agents-mcp-server", lifespan=_lifespan)
@@ -6,20 +6,55 @@ needed in the environment (managed identity, Azure CLI, etc. all work).
 """
 
 import asyncio
+import hashlib
 import logging
 import os
+import random
+import secrets
+import sqlite3
+import string
 import sys
-import uuid
+import threading
+import time
+from array import array
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from functools import cache, lru_cache
+from typing import Optional, Sequence
 
+from azure.core.exceptions import HttpResponseError
+from azure.core.rest import HttpRequest
 from azure.identity import DefaultAzureCredential, ManagedIdentityCredential, get_bearer_token_provider
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from azure.identity.aio import ManagedIdentityCredential as AsyncManagedIdentityCredential
+from azure.search.documents.aio import SearchClient, SearchIndexingBufferedSender
+from azure.search.documents.indexes.aio import SearchIndexClient
 from dotenv import load_dotenv
-from openai import AzureOpenAI
-
-load_dotenv()
+import httpx
+import orjson
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+try:
+    from azure.ai.projects import AIProjectClient
+except ImportError:  # pragma: no cover - only needed for the agents_* tools
+    AIProjectClient = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional shared cache
+    aioredis = None
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - falls back to character truncation
+    tiktoken = None
+
+# Read .env once per process tree; re-imports and child processes skip the
+# filesystem walk that load_dotenv performs to locate the file.
+if not os.environ.get("_FOUNDRY_DOTENV_LOADED"):
+    load_dotenv(override=False)
+    os.environ["_FOUNDRY_DOTENV_LOADED"] = "1"
 
 # ── Logging ────────────────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -36,19 +71,51 @@ AZURE_AI_SEARCH_INDEX_NAME: str = os.getenv("AZURE_AI_SEARCH_INDEX_NAME", "proje
 AZURE_OPENAI_ENDPOINT: str = os.getenv("AZURE_OPENAI_ENDPOINT", "")
 AZURE_OPENAI_EMBEDDING_MODEL: str = os.getenv("AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
 AZURE_OPENAI_EMBEDDING_DIMENSIONS: int = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS", "1536"))
+AZURE_OPENAI_API_VERSION: str = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
 AZURE_OPENAI_COMPLETION_MODEL_NAME: str = os.getenv("AZURE_OPENAI_COMPLETION_MODEL_NAME", "")
 APPLICATIONINSIGHTS_CONNECTION_STRING: str = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "")
+# HNSW graph parameters for the context_vector field (Azure AI Search accepts
+# m 4-10, efConstruction/efSearch 100-1000); only applied when the index is created
+HNSW_M: int = int(os.getenv("HNSW_M", "10"))
+HNSW_EFC: int = int(os.getenv("HNSW_EFC", "400"))
+HNSW_EFS: int = int(os.getenv("HNSW_EFS", "500"))
+EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_REDIS_URL: str = os.getenv("EMBEDDING_CACHE_REDIS_URL", "")
+EMBEDDING_CACHE_SQLITE_PATH: str = os.getenv("EMBEDDING_CACHE_SQLITE_PATH", "")
+EMBEDDING_CACHE_INT8: bool = os.getenv("EMBEDDING_CACHE_INT8", "false").lower() == "true"
+INGEST_MAX_CONCURRENCY: int = int(os.getenv("INGEST_MAX_CONCURRENCY", "8"))
 # When deployed to Container Apps, use a user-assigned managed identity if provided
 _RUNNING_IN_PRODUCTION: bool = os.getenv("RUNNING_IN_PRODUCTION", "false").lower() == "true"
 _AZURE_CLIENT_ID: str = os.getenv("AZURE_CLIENT_ID", "")
 
 # ── Lazy client singletons ─────────────────────────────────────────────────────
 _credential: Optional[DefaultAzureCredential] = None
-_openai_embed_client: Optional[AzureOpenAI] = None
-_openai_chat_client: Optional[AzureOpenAI] = None
+# Azure AI Search uses the native async clients, which need an async credential
+_async_credential: Optional[AsyncDefaultAzureCredential] = None
+_openai_embed_client: Optional[AsyncAzureOpenAI] = None
+_openai_chat_client: Optional[AsyncAzureOpenAI] = None
 _search_client: Optional[SearchClient] = None
 _index_client: Optional[SearchIndexClient] = None
+_buffered_sender: Optional[SearchIndexingBufferedSender] = None
 _project_client = None
+_openai_async_http_client: Optional[httpx.AsyncClient] = None
+
+# Connection pool shared by the embedding and chat clients; HTTP/2
+# multiplexes concurrent requests over one TLS connection.
+_OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Pinned on the SearchClient and used for the raw bulk-upload requests it sends
+_SEARCH_API_VERSION = "2024-07-01"
+
+_COGNITIVE_SCOPE = "https://cognitiveservices.azure.com/.default"
+_SEARCH_SCOPE = "https://search.azure.com/.default"
+
+
+@cache
+def _openai_endpoint() -> str:
+    """Azure OpenAI endpoint, falling back to the Foundry project endpoint."""
+    return AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT
 
 
 def _get_credential() -> DefaultAzureCredential | ManagedIdentityCredential:
@@ -61,26 +128,44 @@ def _get_credential() -> DefaultAzureCredential | ManagedIdentityCredential:
     return _credential
 
 
-def _get_openai_client() -> AzureOpenAI:
-    """Return an AzureOpenAI client configured for the embedding model."""
+def _get_async_credential() -> AsyncDefaultAzureCredential | AsyncManagedIdentityCredential:
+    global _async_credential
+    if _async_credential is None:
+        if _RUNNING_IN_PRODUCTION and _AZURE_CLIENT_ID:
+            _async_credential = AsyncManagedIdentityCredential(client_id=_AZURE_CLIENT_ID)
+        else:
+            _async_credential = AsyncDefaultAzureCredential()
+    return _async_credential
+
+
+def _get_openai_async_http_client() -> httpx.AsyncClient:
+    global _openai_async_http_client
+    if _openai_async_http_client is None:
+        _openai_async_http_client = DefaultAsyncHttpxClient(
+            limits=_OPENAI_HTTP_LIMITS,
+            timeout=_OPENAI_HTTP_TIMEOUT,
+            http2=True,
+        )
+    return _openai_async_http_client
+
+
+def _get_async_openai_client() -> AsyncAzureOpenAI:
+    """Return an AsyncAzureOpenAI client configured for the embedding model."""
     global _openai_embed_client
     if _openai_embed_client is None:
-        cred = _get_credential()
-        token_provider = get_bearer_token_provider(
-            cred, "https://cognitiveservices.azure.com/.default"
-        )
-        endpoint = AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT
-        _openai_embed_client = AzureOpenAI(
+        token_provider = get_bearer_token_provider(_get_credential(), _COGNITIVE_SCOPE)
+        _openai_embed_client = AsyncAzureOpenAI(
             azure_deployment=AZURE_OPENAI_EMBEDDING_MODEL,
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
-            azure_endpoint=endpoint,
+            api_version=AZURE_OPENAI_API_VERSION,
+            azure_endpoint=_openai_endpoint(),
             azure_ad_token_provider=token_provider,
+            http_client=_get_openai_async_http_client(),
         )
     return _openai_embed_client
 
 
-def _get_chat_client() -> Optional[AzureOpenAI]:
-    """Return an AzureOpenAI client configured for the completion model.
+def _get_chat_client() -> Optional[AsyncAzureOpenAI]:
+    """Return an AsyncAzureOpenAI client configured for the completion model.
 
     Returns None when AZURE_OPENAI_COMPLETION_MODEL_NAME is not configured.
     """
@@ -88,16 +173,13 @@ def _get_chat_client() -> Optional[AzureOpenAI]:
     if _openai_chat_client is None:
         if not AZURE_OPENAI_COMPLETION_MODEL_NAME:
             return None
-        cred = _get_credential()
-        token_provider = get_bearer_token_provider(
-            cred, "https://cognitiveservices.azure.com/.default"
-        )
-        endpoint = AZURE_OPENAI_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT
-        _openai_chat_client = AzureOpenAI(
+        token_provider = get_bearer_token_provider(_get_credential(), _COGNITIVE_SCOPE)
+        _openai_chat_client = AsyncAzureOpenAI(
             azure_deployment=AZURE_OPENAI_COMPLETION_MODEL_NAME,
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
-            azure_endpoint=endpoint,
+            api_version=AZURE_OPENAI_API_VERSION,
+            azure_endpoint=_openai_endpoint(),
             azure_ad_token_provider=token_provider,
+            http_client=_get_openai_async_http_client(),
         )
     return _openai_chat_client
 
@@ -110,7 +192,8 @@ def _get_search_client() -> Optional[SearchClient]:
         _search_client = SearchClient(
             endpoint=AZURE_AI_SEARCH_ENDPOINT,
             index_name=AZURE_AI_SEARCH_INDEX_NAME,
-            credential=_get_credential(),
+            credential=_get_async_credential(),
+            api_version=_SEARCH_API_VERSION,
         )
     return _search_client
 
@@ -122,7 +205,7 @@ def _get_index_client() -> Optional[SearchIndexClient]:
             return None
         _index_client = SearchIndexClient(
             endpoint=AZURE_AI_SEARCH_ENDPOINT,
-            credential=_get_credential(),
+            credential=_get_async_credential(),
         )
     return _index_client
 
@@ -133,35 +216,524 @@ def _get_project_client():
     if _project_client is None:
         if not AZURE_AI_PROJECT_ENDPOINT:
             return None
-        try:
-            from azure.ai.projects import AIProjectClient  # noqa: PLC0415
-
-            _project_client = AIProjectClient(
-                endpoint=AZURE_AI_PROJECT_ENDPOINT,
-                credential=_get_credential(),
-            )
-        except ImportError:
+        if AIProjectClient is None:
             logger.error("azure-ai-projects is not installed")
             return None
+        _project_client = AIProjectClient(
+            endpoint=AZURE_AI_PROJECT_ENDPOINT,
+            credential=_get_credential(),
+        )
     return _project_client
 
 
+def _prewarm() -> None:
+    """Acquire an Azure OpenAI token on the sync credential and discard it.
+
+    Blocking; :func:`warmup` runs it in a worker thread (and warms the search
+    scope on the async credential, which the search clients use).  Managed
+    identity and the environment/workload credentials cache the token, so the
+    first real request skips the round-trip.  AzureCliCredential (the usual
+    local-dev credential) does not cache, so there this only surfaces sign-in
+    problems early.
+    """
+    try:
+        _get_credential().get_token(_COGNITIVE_SCOPE)
+    except Exception:
+        logger.debug("Token pre-warm failed for %s", _COGNITIVE_SCOPE, exc_info=True)
+
+
+async def warmup() -> None:
+    """Construct every configured client concurrently (and pre-warm tokens).
+
+    Failures are only logged; the first real request reports them properly.
+    """
+    _get_credential()
+    calls = [
+        _prewarm,
+        _get_tokenizer,  # may download the BPE file on first use
+        _get_chat_client,
+        _get_search_client,
+        _get_index_client,
+        _get_project_client,
+    ]
+    if _openai_endpoint():
+        calls.append(_get_async_openai_client)
+    aws = [asyncio.to_thread(call) for call in calls]
+    if AZURE_AI_SEARCH_ENDPOINT:
+        aws.append(_get_async_credential().get_token(_SEARCH_SCOPE))
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Client warm-up failed: %s", result)
+
+
+async def close_clients() -> None:
+    """Flush pending uploads, then close the async Azure AI Search clients and credential."""
+    global _search_client, _index_client, _buffered_sender, _async_credential
+    for client in (_buffered_sender, _search_client, _index_client, _async_credential):
+        if client is not None:
+            try:
+                await client.close()
+            except Exception:  # noqa: BLE001
+                pass
+    _search_client = _index_client = _buffered_sender = _async_credential = None
+
+
+# ── Buffered uploads ──────────────────────────────────────────────────────────
+# Single-document uploads from concurrent tool calls are queued on one
+# SearchIndexingBufferedSender, which batches them and retries throttled
+# documents. The async sender only flushes when its batch is full, so a short
+# debounced flush task sends whatever has accumulated; each caller awaits a
+# future resolved from the sender's success/error callbacks.
+
+_BUFFERED_FLUSH_DELAY_SECS = 0.05
+_BUFFERED_UPLOAD_TIMEOUT_SECS = 120.0
+_pending_uploads: dict[str, asyncio.Future] = {}
+_flush_task: Optional[asyncio.Task] = None
+
+
+def _action_key(action) -> Optional[str]:
+    props = getattr(action, "additional_properties", None) or action
+    return props.get("id")
+
+
+def _resolve_upload(action, succeeded: bool) -> None:
+    fut = _pending_uploads.pop(_action_key(action), None)
+    if fut is not None and not fut.done():
+        fut.set_result(succeeded)
+
+
+def _get_buffered_sender() -> Optional[SearchIndexingBufferedSender]:
+    global _buffered_sender
+    if _buffered_sender is None:
+        if not AZURE_AI_SEARCH_ENDPOINT:
+            return None
+        _buffered_sender = SearchIndexingBufferedSender(
+            endpoint=AZURE_AI_SEARCH_ENDPOINT,
+            index_name=AZURE_AI_SEARCH_INDEX_NAME,
+            credential=_get_async_credential(),
+            on_progress=lambda action: _resolve_upload(action, True),
+            on_error=lambda action: _resolve_upload(action, False),
+        )
+    return _buffered_sender
+
+
+async def _flush_soon(sender: SearchIndexingBufferedSender) -> None:
+    # Loop so documents queued while a flush was in flight are sent too
+    while _pending_uploads:
+        await asyncio.sleep(_BUFFERED_FLUSH_DELAY_SECS)
+        try:
+            await sender.flush()
+        except Exception as exc:
+            for fut in _pending_uploads.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            _pending_uploads.clear()
+
+
+async def _buffered_upload(document: dict) -> bool:
+    """Queue *document* for a batched upload and wait for its outcome."""
+    global _flush_task
+    sender = _get_buffered_sender()
+    if sender is None:
+        raise RuntimeError("AZURE_AI_SEARCH_ENDPOINT is not configured.")
+    fut = asyncio.get_running_loop().create_future()
+    _pending_uploads[document["id"]] = fut
+    await sender.upload_documents(documents=[document])
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.create_task(_flush_soon(sender))
+    try:
+        return await asyncio.wait_for(fut, _BUFFERED_UPLOAD_TIMEOUT_SECS)
+    finally:
+        _pending_uploads.pop(document["id"], None)
+
+
+# Large batches are posted as orjson-encoded bytes; the SDK's json.dumps of
+# thousands of embedding floats per document dominates upload CPU time.
+# Service limit on documents per indexing request
+_UPLOAD_MAX_DOCS = 1000
+# Caps concurrent indexing requests so large ingests don't trip 503 throttling;
+# 429/503 responses are still retried with backoff by the SDK pipeline.
+_upload_semaphore = asyncio.Semaphore(INGEST_MAX_CONCURRENCY)
+# A batch rejected as too large, or still throttled once the pipeline's own
+# retries are exhausted, is split in half and the halves sent one after another.
+_UPLOAD_SPLIT_STATUSES = frozenset({413, 503})
+_UPLOAD_SPLIT_BACKOFF_SECS = 1.0
+
+
+async def _upload_documents(documents: list[dict]) -> set[str]:
+    """Upload *documents* and return the keys that succeeded.
+
+    Up to _UPLOAD_MAX_DOCS documents go in one indexing request; larger lists
+    are split and the requests issued concurrently.  Batches the service
+    rejects as too large or throttled are retried in halves.
+    """
+    if len(documents) > _UPLOAD_MAX_DOCS:
+        uploaded = await asyncio.gather(
+            *(
+                _upload_documents(documents[i : i + _UPLOAD_MAX_DOCS])
+                for i in range(0, len(documents), _UPLOAD_MAX_DOCS)
+            )
+        )
+        return set().union(*uploaded)
+
+    client = _get_search_client()
+    if client is None:
+        raise RuntimeError("AZURE_AI_SEARCH_ENDPOINT is not configured.")
+    body = orjson.dumps({"value": [{"@search.action": "upload", **doc} for doc in documents]})
+    # Absolute URL: the SDK's base URL is the bare endpoint in 12.x but already
+    # includes /indexes('<name>') in 11.x, so a relative path is not portable.
+    request = HttpRequest(
+        "POST",
+        f"{AZURE_AI_SEARCH_ENDPOINT.rstrip('/')}/indexes('{AZURE_AI_SEARCH_INDEX_NAME}')/docs/search.index",
+        params={"api-version": _SEARCH_API_VERSION},
+        headers={"Content-Type": "application/json"},
+        content=body,
+    )
+    async with _upload_semaphore:
+        response = await client.send_request(request)
+    try:
+        response.raise_for_status()
+    except HttpResponseError as exc:
+        if exc.status_code not in _UPLOAD_SPLIT_STATUSES or len(documents) == 1:
+            raise
+        logger.warning(
+            "Indexing %d documents failed with %s; retrying in halves", len(documents), exc.status_code
+        )
+        await asyncio.sleep(_UPLOAD_SPLIT_BACKOFF_SECS * random.uniform(0.5, 1.5))
+        mid = len(documents) // 2
+        first = await _upload_documents(documents[:mid])
+        return first | await _upload_documents(documents[mid:])
+    return {r["key"] for r in response.json()["value"] if r.get("status")}
+
+
 # ── Embedding helpers ─────────────────────────────────────────────────────────
 
-def _embed_sync(text: str) -> list[float]:
-    """Generate a vector embedding using Azure OpenAI (blocking)."""
-    client = _get_openai_client()
-    response = client.embeddings.create(
-        input=text,
+# The embedding models reject inputs over 8191 tokens; leave a little headroom.
+MAX_EMBED_TOKENS: int = 8000
+# Conservative ratio used to truncate ASCII text when tiktoken is not installed
+_FALLBACK_CHARS_PER_TOKEN: int = 3
+# Service limit on inputs per embeddings request
+_EMBED_MAX_INPUTS = 2048
+
+
+@cache
+def _get_tokenizer():
+    """Return the tokenizer for the embedding model, or None."""
+    if tiktoken is None:
+        return None
+    try:
+        # Deployment names are often custom; the embedding models all use cl100k_base
+        try:
+            return tiktoken.encoding_for_model(AZURE_OPENAI_EMBEDDING_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        logger.warning("Could not load tiktoken encoding; truncating by characters", exc_info=True)
+        return None
+
+
+def _may_exceed_embed_limit(text: str) -> bool:
+    """Cheap pre-check: False means *text* is certainly within MAX_EMBED_TOKENS."""
+    # Byte-level BPE: every token covers at least one UTF-8 byte (not one
+    # character - CJK and emoji can take several tokens each)
+    return len(text.encode()) > MAX_EMBED_TOKENS
+
+
+# Memoised so a tool can check for truncation without encoding the text twice.
+# Loads and runs the tokenizer, so callers on the event loop use a worker thread.
+@lru_cache(maxsize=64)
+def _prepare_for_embedding(text: str) -> str:
+    """Truncate *text* to at most MAX_EMBED_TOKENS tokens."""
+    if not _may_exceed_embed_limit(text):
+        return text
+    encoder = _get_tokenizer()
+    if encoder is None:
+        # The ratio only holds for ASCII; otherwise fall back to the byte bound
+        limit = MAX_EMBED_TOKENS * _FALLBACK_CHARS_PER_TOKEN if text.isascii() else MAX_EMBED_TOKENS
+        return text.encode()[:limit].decode(errors="ignore")
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= MAX_EMBED_TOKENS:
+        return text
+    return encoder.decode(tokens[:MAX_EMBED_TOKENS])
+
+
+async def _is_truncated_for_embedding(text: str) -> bool:
+    if not _may_exceed_embed_limit(text):
+        return False
+    return len(await asyncio.to_thread(_prepare_for_embedding, text)) < len(text)
+
+
+_TRUNCATION_NOTE = (
+    f"- **Note**: the text exceeds {MAX_EMBED_TOKENS} tokens; "
+    "only its beginning was embedded (the full text is stored)"
+)
+
+
+async def _embed_many(texts: list[str]) -> list[list[float]]:
+    """Generate vector embeddings for *texts* with as few Azure OpenAI requests as possible.
+
+    Up to _EMBED_MAX_INPUTS texts go in one request; larger lists are split
+    and the requests issued concurrently.  Texts longer than MAX_EMBED_TOKENS
+    are truncated first.  Results are returned in the same order as *texts*.
+    """
+    if len(texts) > _EMBED_MAX_INPUTS:
+        batches = await asyncio.gather(
+            *(
+                _embed_many(texts[i : i + _EMBED_MAX_INPUTS])
+                for i in range(0, len(texts), _EMBED_MAX_INPUTS)
+            )
+        )
+        return [vector for batch in batches for vector in batch]
+
+    inputs = texts
+    if any(_may_exceed_embed_limit(text) for text in texts):
+        inputs = await asyncio.to_thread(lambda: [_prepare_for_embedding(text) for text in texts])
+    client = _get_async_openai_client()
+    response = await client.embeddings.create(
+        input=inputs,
         model=AZURE_OPENAI_EMBEDDING_MODEL,
         dimensions=AZURE_OPENAI_EMBEDDING_DIMENSIONS,
     )
-    return response.data[0].embedding
+    return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+
+# Concurrent single-text _embed calls arriving within this window are sent to
+# Azure OpenAI as one batched request.
+_EMBED_BATCH_WINDOW_SECS: float = 0.01
+_EMBED_MAX_BATCH: int = 64
+_embed_queue: Optional[asyncio.Queue] = None
+_embed_worker: Optional[asyncio.Task] = None
+_embed_dispatches: set[asyncio.Task] = set()
+
+
+async def _dispatch_embed_batch(items: list[tuple[str, asyncio.Future]]) -> None:
+    try:
+        vectors = await _embed_many([text for text, _ in items])
+    except Exception as exc:
+        if len(items) > 1:
+            # One bad input (e.g. an empty string) fails the whole request;
+            # retry each text alone so only its own caller sees the error
+            logger.debug("Batched embedding failed; retrying %d texts individually", len(items))
+            await asyncio.gather(*(_dispatch_embed_batch([item]) for item in items))
+            return
+        for _, fut in items:
+            if not fut.done():
+                fut.set_exception(exc)
+        return
+    for (_, fut), vector in zip(items, vectors):
+        if not fut.done():
+            fut.set_result(vector)
+
+
+async def _embed_batcher(queue: asyncio.Queue) -> None:
+    """Collect queued embed requests into batches and dispatch each batch."""
+    while True:
+        items = [await queue.get()]
+        await asyncio.sleep(_EMBED_BATCH_WINDOW_SECS)
+        while len(items) < _EMBED_MAX_BATCH and not queue.empty():
+            items.append(queue.get_nowait())
+        items = [(text, fut) for text, fut in items if not fut.cancelled()]
+        if not items:
+            continue
+        task = asyncio.create_task(_dispatch_embed_batch(items))
+        _embed_dispatches.add(task)
+        task.add_done_callback(_embed_dispatches.discard)
+
+
+def _get_embed_queue() -> asyncio.Queue:
+    """Return the embed queue, starting the batcher on the running loop if needed."""
+    global _embed_queue, _embed_worker
+    loop = asyncio.get_running_loop()
+    if _embed_worker is None or _embed_worker.done() or _embed_worker.get_loop() is not loop:
+        _embed_queue = asyncio.Queue()
+        _embed_worker = loop.create_task(_embed_batcher(_embed_queue))
+    return _embed_queue
 
 
 async def _embed(text: str) -> list[float]:
-    """Generate a vector embedding (async wrapper)."""
-    return await asyncio.to_thread(_embed_sync, text)
+    """Generate a vector embedding using Azure OpenAI.
+
+    Coalesced with other concurrent calls into a single batched request.
+    """
+    fut = asyncio.get_running_loop().create_future()
+    _get_embed_queue().put_nowait((text, fut))
+    return await fut
+
+
+# ── Embedding cache ───────────────────────────────────────────────────────────
+# Embeddings are deterministic per (model, dimensions, text), so repeated
+# queries and re-ingested contexts are served from an in-process LRU and, when
+# EMBEDDING_CACHE_REDIS_URL is set, a Redis cache shared across replicas.
+
+_EMBED_REDIS_TTL_SECS = 30 * 86400
+# A cached vector: a list of floats, or int8 bytes plus their scale when
+# EMBEDDING_CACHE_INT8 is enabled (~1.5 KB instead of ~50 KB per 1536-d vector)
+_CachedEmbedding = list[float] | tuple[bytes, float]
+_embed_cache: "OrderedDict[str, _CachedEmbedding]" = OrderedDict()
+_redis_client = None
+
+
+def _get_redis_client():
+    """Return the shared Redis client, or None when not configured/installed."""
+    global _redis_client
+    if _redis_client is None and EMBEDDING_CACHE_REDIS_URL:
+        if aioredis is None:
+            logger.warning("EMBEDDING_CACHE_REDIS_URL is set but redis is not installed")
+            return None
+        _redis_client = aioredis.from_url(EMBEDDING_CACHE_REDIS_URL)
+    return _redis_client
+
+
+def _pack_embedding(vector: list[float]) -> _CachedEmbedding:
+    if not EMBEDDING_CACHE_INT8:
+        return vector
+    scale = max(map(abs, vector), default=0.0) / 127 or 1.0
+    return array("b", [round(v / scale) for v in vector]).tobytes(), scale
+
+
+def _unpack_embedding(entry: _CachedEmbedding) -> list[float]:
+    if isinstance(entry, list):
+        return entry
+    data, scale = entry
+    return [v * scale for v in array("b", data)]
+
+
+def _remember_embedding(key: str, entry: _CachedEmbedding) -> None:
+    _embed_cache[key] = entry
+    _embed_cache.move_to_end(key)
+    if len(_embed_cache) > EMBEDDING_CACHE_SIZE:
+        _embed_cache.popitem(last=False)
+
+
+# Punctuation is dropped from the secondary key so formatting-only edits
+# (case, whitespace, punctuation) reuse the earlier embedding.
+_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
+# Vectors depend on the deployment and the requested dimensions as well as the text
+_EMBED_KEY_PREFIX = f"{AZURE_OPENAI_EMBEDDING_MODEL}\0{AZURE_OPENAI_EMBEDDING_DIMENSIONS}\0"
+
+
+def _embed_cache_keys(text: str) -> tuple[str, str]:
+    """Return the exact and normalised cache keys for *text*."""
+    normalised = " ".join(text.lower().translate(_PUNCTUATION_TABLE).split())
+    return (
+        hashlib.sha256(f"{_EMBED_KEY_PREFIX}{text}".encode()).hexdigest(),
+        "n:" + hashlib.sha256(f"{_EMBED_KEY_PREFIX}{normalised}".encode()).hexdigest(),
+    )
+
+
+# Optional on-disk tier (EMBEDDING_CACHE_SQLITE_PATH) so stdio servers, which
+# are restarted with every client session, keep their embeddings.
+_embed_db_lock = threading.Lock()
+
+
+@cache
+def _get_embed_db() -> Optional[sqlite3.Connection]:
+    """Open the SQLite embedding cache, or return None when not configured/unusable."""
+    if not EMBEDDING_CACHE_SQLITE_PATH:
+        return None
+    path = Path(EMBEDDING_CACHE_SQLITE_PATH).expanduser()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT, dims INTEGER, vector BLOB, scale REAL, created_at INTEGER)"
+        )
+    except (OSError, sqlite3.Error):
+        logger.warning("Could not open embedding cache at %s", path, exc_info=True)
+        return None
+    return db
+
+
+def _db_load_embedding(db: sqlite3.Connection, keys: tuple[str, ...]) -> Optional[_CachedEmbedding]:
+    with _embed_db_lock:
+        for key in keys:
+            row = db.execute("SELECT vector, scale FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                blob, scale = row
+                if scale is not None:
+                    return blob, scale
+                vector = array("f")
+                vector.frombytes(blob)
+                return vector.tolist()
+    return None
+
+
+def _db_store_embedding(db: sqlite3.Connection, keys: tuple[str, ...], entry: _CachedEmbedding) -> None:
+    # float32 blobs are a quarter of the size of the JSON text; int8 entries
+    # keep their bytes and record the scale
+    blob, scale = entry if isinstance(entry, tuple) else (array("f", entry).tobytes(), None)
+    now = int(time.time())
+    rows = [
+        (key, AZURE_OPENAI_EMBEDDING_MODEL, AZURE_OPENAI_EMBEDDING_DIMENSIONS, blob, scale, now)
+        for key in keys
+    ]
+    with _embed_db_lock, db:
+        db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+async def _embed_cached(text: str) -> list[float]:
+    """Return the embedding for *text*, reusing a cached vector when possible.
+
+    Vectors are cached under the exact text and under a normalised form, so a
+    text that differs only in formatting is served from the cache as well.
+    """
+    keys = _embed_cache_keys(text)
+    for key in keys:
+        entry = _embed_cache.get(key)
+        if entry is not None:
+            _embed_cache.move_to_end(key)
+            _remember_embedding(keys[0], entry)
+            return _unpack_embedding(entry)
+
+    vector = None
+    db = _get_embed_db()
+    if db is not None:
+        try:
+            entry = await asyncio.to_thread(_db_load_embedding, db, keys)
+            if entry is not None:
+                vector = _unpack_embedding(entry)
+        except sqlite3.Error:
+            logger.warning("Embedding cache lookup failed", exc_info=True)
+
+    redis = _get_redis_client()
+    if vector is None and redis is not None:
+        try:
+            raw = next(
+                (r for r in await redis.mget([f"emb:{key}" for key in keys]) if r is not None),
+                None,
+            )
+            if raw is not None:
+                vector = orjson.loads(raw)
+        except Exception:
+            logger.warning("Embedding cache lookup failed", exc_info=True)
+
+    if vector is None:
+        vector = await _embed(text)
+        if redis is not None:
+            try:
+                payload = orjson.dumps(vector)
+                async with redis.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.set(f"emb:{key}", payload, ex=_EMBED_REDIS_TTL_SECS)
+                    await pipe.execute()
+            except Exception:
+                logger.warning("Embedding cache store failed", exc_info=True)
+        if db is not None:
+            try:
+                await asyncio.to_thread(_db_store_embedding, db, keys, _pack_embedding(vector))
+            except sqlite3.Error:
+                logger.warning("Embedding cache store failed", exc_info=True)
+
+    entry = _pack_embedding(vector)
+    for key in keys:
+        _remember_embedding(key, entry)
+    return vector
 
 
 # ── Invocation ID helpers ─────────────────────────────────────────────────────
@@ -171,17 +743,35 @@ def _make_invocation_id(thread_id: str, run_id: str) -> str:
 
 
 def _parse_invocation_id(invocation_id: str) -> tuple[str, str]:
-    parts = invocation_id.split("::")
-    if len(parts) != 2:
+    thread_id, sep, run_id = invocation_id.partition("::")
+    if not (thread_id and run_id) or "::" in run_id:
         raise ValueError(
             f"Invalid invocation ID '{invocation_id}'. "
             "Expected format: '<thread_id>::<run_id>'."
         )
-    return parts[0], parts[1]
+    return thread_id, run_id
 
 
 # ── Document helper ───────────────────────────────────────────────────────────
 
+# The index keeps only an int8-quantized copy of the vector, so six decimals
+# lose nothing that matters and roughly halve the JSON size of each vector.
+_VECTOR_DECIMALS = 6
+
+
+@lru_cache(maxsize=512)
+def _parse_tags(tags: str) -> tuple[str, ...]:
+    # Interned so repeated tags share one string object across documents
+    return tuple(sys.intern(tag) for tag in (part.strip() for part in tags.split(",")) if tag)
+
+
+def _split_tags(tags: str | Sequence[str] | None) -> tuple[str, ...]:
+    """Return *tags* as a tuple, splitting a comma-separated string."""
+    if isinstance(tags, str):
+        return _parse_tags(tags)
+    return tuple(tags or ())
+
+
 def _build_document(
     *,
     title: str,
@@ -191,22 +781,26 @@ def _build_document(
     context: str,
     context_vector: list[float],
     project_name: str = "",
-    tags: list[str] | None = None,
+    tags: Sequence[str] | None = None,
     reference_url: str = "",
     architecture: str = "",
+    now: str | None = None,
 ) -> dict:
-    """Build a document dict ready for upload to the Azure AI Search index."""
-    now = datetime.now(timezone.utc).isoformat()
+    """Build a document dict ready for upload to the Azure AI Search index.
+
+    Pass *now* to share one timestamp across a batch of documents.
+    """
+    now = now or datetime.now(timezone.utc).isoformat()
     return {
-        "id": str(uuid.uuid4()),
+        "id": secrets.token_hex(16),
         "title": title,
         "type": entry_type,
         "customer_name": customer_name,
         "short_summary": short_summary,
         "context": context,
-        "context_vector": context_vector,
+        "context_vector": [round(v, _VECTOR_DECIMALS) for v in context_vector],
         "project_name": project_name,
-        "tags": tags or [],
+        "tags": tags or (),
         "reference_url": reference_url,
         "architecture": architecture,
         "creation_date": now,
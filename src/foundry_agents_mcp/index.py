@@ -5,10 +5,15 @@ project log entries with auto-generated vector embeddings.
 """
 
 import asyncio
+import functools
+from datetime import datetime, timezone
+from typing import Sequence
 
-from azure.search.documents import SearchClient
+from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
+    HnswParameters,
+    ScalarQuantizationCompression,
     SearchField,
     SearchFieldDataType,
     SearchIndex,
@@ -21,14 +26,23 @@ from foundry_agents_mcp.client import (
     AZURE_AI_SEARCH_ENDPOINT,
     AZURE_AI_SEARCH_INDEX_NAME,
     AZURE_OPENAI_EMBEDDING_DIMENSIONS,
+    HNSW_EFC,
+    HNSW_EFS,
+    HNSW_M,
+    _TRUNCATION_NOTE,
+    _buffered_upload,
     _build_document,
-    _embed,
-    _get_credential,
+    _embed_cached,
+    _embed_many,
     _get_index_client,
+    _is_truncated_for_embedding,
+    _split_tags,
+    _upload_documents,
     logger,
 )
 
 
+@functools.cache
 def _build_index_fields() -> list:
     """Return the field definitions for the project-log search index."""
     return [
@@ -63,6 +77,9 @@ def _build_index_fields() -> list:
             type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
             vector_search_dimensions=AZURE_OPENAI_EMBEDDING_DIMENSIONS,
             vector_search_profile_name="hnsw-profile",
+            # Never returned to callers; keep only the int8-quantized index copy
+            hidden=True,
+            stored=False,
         ),
         SearchField(
             name="project_name",
@@ -95,41 +112,73 @@ def _build_index_fields() -> list:
     ]
 
 
+@functools.cache
+def _build_index() -> SearchIndex:
+    """Return the project-log index definition (built once per process)."""
+    vector_search = VectorSearch(
+        profiles=[
+            VectorSearchProfile(
+                name="hnsw-profile",
+                algorithm_configuration_name="hnsw",
+                compression_name="sq",
+            )
+        ],
+        algorithms=[
+            HnswAlgorithmConfiguration(
+                name="hnsw",
+                parameters=HnswParameters(
+                    m=HNSW_M,
+                    ef_construction=HNSW_EFC,
+                    ef_search=HNSW_EFS,
+                    metric="cosine",
+                ),
+            )
+        ],
+        compressions=[ScalarQuantizationCompression(compression_name="sq")],
+    )
+    return SearchIndex(
+        name=AZURE_AI_SEARCH_INDEX_NAME,
+        fields=_build_index_fields(),
+        vector_search=vector_search,
+    )
+
+
+# Set once the index is known to exist, so later ingests skip the GET; the lock
+# makes concurrent first calls share a single check/create.
+_index_ready = asyncio.Event()
+_index_lock = asyncio.Lock()
+
+
 async def _ensure_index_exists() -> str | None:
     """Create the project-log index if it does not already exist.
 
     Returns an error string on failure, or None on success.
     """
+    if _index_ready.is_set():
+        return None
+
     index_client = _get_index_client()
     if index_client is None:
         return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
 
-    from azure.core.exceptions import ResourceNotFoundError  # noqa: PLC0415
+    async with _index_lock:
+        if _index_ready.is_set():
+            return None
 
-    try:
-        await asyncio.to_thread(
-            lambda: index_client.get_index(AZURE_AI_SEARCH_INDEX_NAME)
-        )
-        return None  # already exists
-    except ResourceNotFoundError:
-        pass
+        try:
+            await index_client.get_index(AZURE_AI_SEARCH_INDEX_NAME)
+            _index_ready.set()
+            return None  # already exists
+        except ResourceNotFoundError:
+            pass
 
-    fields = _build_index_fields()
-    vector_search = VectorSearch(
-        profiles=[VectorSearchProfile(name="hnsw-profile", algorithm_configuration_name="hnsw")],
-        algorithms=[HnswAlgorithmConfiguration(name="hnsw")],
-    )
-    index = SearchIndex(
-        name=AZURE_AI_SEARCH_INDEX_NAME,
-        fields=fields,
-        vector_search=vector_search,
-    )
-    try:
-        await asyncio.to_thread(lambda: index_client.create_or_update_index(index))
-        return None
-    except Exception as exc:
-        logger.exception("_ensure_index_exists failed")
-        return f"Error creating index: {exc}"
+        try:
+            await index_client.create_or_update_index(_build_index())
+            _index_ready.set()
+            return None
+        except Exception as exc:
+            logger.exception("_ensure_index_exists failed")
+            return f"Error creating index: {exc}"
 
 
 async def _ingest_project_log_doc(
@@ -140,7 +189,7 @@ async def _ingest_project_log_doc(
     short_summary: str,
     context: str,
     project_name: str = "",
-    tags: list[str] | None = None,
+    tags: Sequence[str] | None = None,
     reference_url: str = "",
     architecture: str = "",
 ) -> str:
@@ -148,11 +197,16 @@ async def _ingest_project_log_doc(
     if not AZURE_AI_SEARCH_ENDPOINT:
         return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
 
-    err = await _ensure_index_exists()
+    # The index check and the embedding are independent; overlap the round-trips
+    err, embedding = await asyncio.gather(
+        _ensure_index_exists(),
+        _embed_cached(context),
+        return_exceptions=True,
+    )
     if err:
-        return err
-
-    embedding = await _embed(context)
+        return err if isinstance(err, str) else f"Error creating index: {err}"
+    if isinstance(embedding, BaseException):
+        raise embedding
 
     document = _build_document(
         title=title,
@@ -162,32 +216,70 @@ async def _ingest_project_log_doc(
         context=context,
         context_vector=embedding,
         project_name=project_name,
-        tags=tags or [],
+        tags=tags,
         reference_url=reference_url,
         architecture=architecture,
     )
 
-    ingest_client = SearchClient(
-        endpoint=AZURE_AI_SEARCH_ENDPOINT,
-        index_name=AZURE_AI_SEARCH_INDEX_NAME,
-        credential=_get_credential(),
-    )
-    results = await asyncio.to_thread(
-        lambda: list(ingest_client.upload_documents(documents=[document]))
-    )
-    succeeded = sum(1 for r in results if r.succeeded)
-
-    if succeeded:
-        return (
+    if await _buffered_upload(document):
+        result = (
             "Project log ingested successfully.\n"
             f"- **ID**: `{document['id']}`\n"
             f"- **Title**: {title}\n"
             f"- **Type**: {entry_type}\n"
             f"- **Customer**: {customer_name}"
         )
+        if await _is_truncated_for_embedding(context):
+            result += f"\n{_TRUNCATION_NOTE}"
+        return result
     return "Failed to ingest project log document."
 
 
+async def _ingest_project_log_docs_batch(entries: list[dict]) -> str:
+    """Ingest many entries with one embeddings call and one upload per batch."""
+    if not AZURE_AI_SEARCH_ENDPOINT:
+        return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
+    if not entries:
+        return "No project log entries to ingest."
+
+    contexts = [entry.get("context", "") for entry in entries]
+    err, vectors = await asyncio.gather(
+        _ensure_index_exists(),
+        _embed_many(contexts),
+        return_exceptions=True,
+    )
+    if err:
+        return err if isinstance(err, str) else f"Error creating index: {err}"
+    if isinstance(vectors, BaseException):
+        raise vectors
+
+    now = datetime.now(timezone.utc).isoformat()
+    documents = [
+        _build_document(
+            title=entry.get("title", ""),
+            entry_type=entry.get("entry_type", "meeting"),
+            customer_name=entry.get("customer_name", ""),
+            short_summary=entry.get("short_summary", ""),
+            context=context,
+            context_vector=vector,
+            project_name=entry.get("project_name", ""),
+            tags=_split_tags(entry.get("tags")),
+            reference_url=entry.get("reference_url", ""),
+            architecture=entry.get("architecture", ""),
+            now=now,
+        )
+        for entry, context, vector in zip(entries, contexts, vectors)
+    ]
+
+    succeeded = await _upload_documents(documents)
+
+    lines = [f"Ingested {len(succeeded)} of {len(documents)} project log entries.\n"]
+    for doc in documents:
+        mark = "✅" if doc["id"] in succeeded else "❌"
+        lines.append(f"- {mark} `{doc['id']}` – {doc['title']}")
+    return "\n".join(lines)
+
+
 @mcp.tool()
 async def index_create_project_log_index() -> str:
     """Create the project log search index in Azure AI Search.
@@ -210,33 +302,17 @@ async def index_create_project_log_index() -> str:
         return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
 
     try:
-        from azure.core.exceptions import ResourceNotFoundError  # noqa: PLC0415
-
         try:
-            await asyncio.to_thread(
-                lambda: index_client.get_index(AZURE_AI_SEARCH_INDEX_NAME)
-            )
+            await index_client.get_index(AZURE_AI_SEARCH_INDEX_NAME)
+            _index_ready.set()
             return f"Index '{AZURE_AI_SEARCH_INDEX_NAME}' already exists."
         except ResourceNotFoundError:
             pass
 
-        fields = _build_index_fields()
-        vector_search = VectorSearch(
-            profiles=[
-                VectorSearchProfile(name="hnsw-profile", algorithm_configuration_name="hnsw")
-            ],
-            algorithms=[HnswAlgorithmConfiguration(name="hnsw")],
-        )
-        index = SearchIndex(
-            name=AZURE_AI_SEARCH_INDEX_NAME,
-            fields=fields,
-            vector_search=vector_search,
-        )
-
-        result = await asyncio.to_thread(
-            lambda: index_client.create_or_update_index(index)
-        )
-        field_names = ", ".join(f.name for f in fields)
+        index = _build_index()
+        result = await index_client.create_or_update_index(index)
+        _index_ready.set()
+        field_names = ", ".join(f.name for f in index.fields)
         return (
             f"Index '{result.name}' created successfully.\n"
             f"Fields: {field_names}"
@@ -280,7 +356,6 @@ async def index_ingest_project_log(
     - "Index a new meeting summary about the cloud migration project"
     - "Store this repo documentation with tags: python, mcp, azure"
     """
-    tags_list = [t.strip() for t in tags.split(",")] if tags else []
     try:
         return await _ingest_project_log_doc(
             title=title,
@@ -289,10 +364,35 @@ async def index_ingest_project_log(
             short_summary=short_summary,
             context=context,
             project_name=project_name,
-            tags=tags_list,
+            tags=_split_tags(tags),
             reference_url=reference_url,
             architecture=architecture,
         )
     except Exception as exc:
         logger.exception("index_ingest_project_log failed")
         return f"Error ingesting project log: {exc}"
+
+
+@mcp.tool()
+async def index_ingest_project_logs_bulk(entries: list[dict]) -> str:
+    """Ingest many project log entries at once with batched embeddings.
+
+    All contexts are embedded in a single Azure OpenAI request (per 2048
+    entries) and uploaded together, instead of one round-trip per entry.
+    Creates the index automatically if it does not exist.
+
+    Args:
+        entries: List of objects with the same fields as
+            ``index_ingest_project_log``: title, entry_type, customer_name,
+            short_summary, context, and optionally project_name, tags
+            (comma-separated string or list), reference_url, architecture.
+
+    Example prompts:
+    - "Ingest these five meeting summaries into the project log in one go"
+    - "Bulk-index the following workshop notes: ..."
+    """
+    try:
+        return await _ingest_project_log_docs_batch(entries)
+    except Exception as exc:
+        logger.exception("index_ingest_project_logs_bulk failed")
+        return f"Error ingesting project logs: {exc}"
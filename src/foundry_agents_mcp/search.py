@@ -4,20 +4,59 @@ Provides semantic vector search and document ingestion for the Azure AI Search
 project-log index.
 """
 
-import asyncio
+from collections import ChainMap
+from datetime import datetime, timezone
 from typing import Optional
 
 from azure.search.documents.models import VectorizedQuery
 
 from foundry_agents_mcp.app import mcp
 from foundry_agents_mcp.client import (
+    AZURE_AI_SEARCH_ENDPOINT,
     AZURE_AI_SEARCH_INDEX_NAME,
+    _TRUNCATION_NOTE,
+    _buffered_upload,
     _build_document,
-    _embed,
+    _embed_cached,
+    _embed_many,
     _get_search_client,
+    _is_truncated_for_embedding,
+    _split_tags,
+    _upload_documents,
     logger,
 )
 
+_SEARCH_MIN_KNN = 50
+
+# Only the fields search_vector_db displays are returned over the wire
+_SEARCH_SELECT = [
+    "title",
+    "type",
+    "customer_name",
+    "short_summary",
+    "project_name",
+    "tags",
+    "reference_url",
+]
+
+# One search hit; missing fields fall back to _RESULT_DEFAULTS and the
+# optional *_line slots are empty unless the hit has that field
+_RESULT_TEMPLATE = (
+    "### {rank}. {title}\n"
+    "- **Type**: {type}\n"
+    "- **Customer**: {customer_name}\n"
+    "- **Project**: {project_name}\n"
+    "- **Summary**: {short_summary}\n"
+    "{tags_line}{ref_line}{score_line}"
+)
+_RESULT_DEFAULTS = {
+    "title": "Untitled",
+    "type": "N/A",
+    "customer_name": "N/A",
+    "project_name": "N/A",
+    "short_summary": "N/A",
+}
+
 
 @mcp.tool()
 async def search_vector_db(query: str, top_k: int = 5) -> str:
@@ -44,53 +83,40 @@ async def search_vector_db(query: str, top_k: int = 5) -> str:
         )
 
     try:
-        embedding = await _embed(query)
+        embedding = await _embed_cached(query)
         vector_query = VectorizedQuery(
             vector=embedding,
-            k_nearest_neighbors=top_k,
+            # Give HNSW a wider candidate set, then keep the best top_k
+            k_nearest_neighbors=max(top_k, _SEARCH_MIN_KNN),
             fields="context_vector",
         )
 
-        results = await asyncio.to_thread(
-            lambda: list(
-                search_client.search(
-                    search_text=None,
-                    vector_queries=[vector_query],
-                    select=[
-                        "id",
-                        "title",
-                        "type",
-                        "customer_name",
-                        "short_summary",
-                        "project_name",
-                        "tags",
-                        "reference_url",
-                        "creation_date",
-                    ],
-                    top=top_k,
-                )
-            )
+        paged = await search_client.search(
+            search_text=None,
+            vector_queries=[vector_query],
+            select=_SEARCH_SELECT,
+            top=top_k,
+            include_total_count=False,
         )
 
-        if not results:
-            return f"No results found for query: '{query}'"
-
+        # Format each result as its page arrives instead of collecting them first
         lines = [f"## Search Results for: '{query}'\n"]
-        for i, r in enumerate(results, 1):
-            lines.append(f"### {i}. {r.get('title', 'Untitled')}")
-            lines.append(f"- **Type**: {r.get('type', 'N/A')}")
-            lines.append(f"- **Customer**: {r.get('customer_name', 'N/A')}")
-            lines.append(f"- **Project**: {r.get('project_name', 'N/A')}")
-            lines.append(f"- **Summary**: {r.get('short_summary', 'N/A')}")
-            tags = r.get("tags") or []
-            if tags:
-                lines.append(f"- **Tags**: {', '.join(tags)}")
-            if r.get("reference_url"):
-                lines.append(f"- **Reference**: {r['reference_url']}")
+        i = 0
+        async for r in paged:
+            i += 1
+            tags = r.get("tags")
+            ref = r.get("reference_url")
             score = r.get("@search.score")
-            if score is not None:
-                lines.append(f"- **Relevance Score**: {score:.4f}")
-            lines.append("")
+            extras = {
+                "rank": i,
+                "tags_line": f"- **Tags**: {', '.join(tags)}\n" if tags else "",
+                "ref_line": f"- **Reference**: {ref}\n" if ref else "",
+                "score_line": f"- **Relevance Score**: {score:.4f}\n" if score is not None else "",
+            }
+            lines.append(_RESULT_TEMPLATE.format_map(ChainMap(extras, r, _RESULT_DEFAULTS)))
+
+        if not i:
+            return f"No results found for query: '{query}'"
 
         return "\n".join(lines)
 
@@ -132,13 +158,11 @@ async def search_add_to_vector_db(
     - "Store a new project log about our Kubernetes migration discussion"
     - "Index this blog post with tags: azure, containers, devops"
     """
-    search_client = _get_search_client()
-    if search_client is None:
+    if not AZURE_AI_SEARCH_ENDPOINT:
         return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
 
     try:
-        embedding = await _embed(content)
-        tags_list = [t.strip() for t in tags.split(",")] if tags else []
+        embedding = await _embed_cached(content)
 
         document = _build_document(
             title=title,
@@ -148,25 +172,79 @@ async def search_add_to_vector_db(
             context=content,
             context_vector=embedding,
             project_name=project_name,
-            tags=tags_list,
+            tags=_split_tags(tags),
             reference_url=reference_url,
             architecture=architecture,
         )
 
-        results = await asyncio.to_thread(
-            lambda: list(search_client.upload_documents(documents=[document]))
-        )
-        succeeded = sum(1 for r in results if r.succeeded)
-
-        if succeeded:
-            return (
+        if await _buffered_upload(document):
+            result = (
                 "Document added to vector database.\n"
                 f"- **ID**: `{document['id']}`\n"
                 f"- **Title**: {title}\n"
                 f"- **Type**: {entry_type}"
             )
+            if await _is_truncated_for_embedding(content):
+                result += f"\n{_TRUNCATION_NOTE}"
+            return result
         return "Failed to add document to vector database."
 
     except Exception as exc:
         logger.exception("search_add_to_vector_db failed")
         return f"Error adding to vector database: {exc}"
+
+
+@mcp.tool()
+async def search_add_batch(documents: list[dict]) -> str:
+    """Add many documents to the project vector database at once.
+
+    All contents are embedded with as few Azure OpenAI requests as possible
+    (up to 2048 per request) and uploaded in batches of up to 1000, instead
+    of one round-trip per document.
+
+    Args:
+        documents: List of objects with the same fields as
+            ``search_add_to_vector_db``: title, content, and optionally
+            entry_type, customer_name, short_summary, project_name, tags
+            (comma-separated string or list), reference_url, architecture.
+
+    Example prompts:
+    - "Add these ten blog post summaries to the vector database"
+    - "Store all of the following meeting notes in the vector index"
+    """
+    if not AZURE_AI_SEARCH_ENDPOINT:
+        return "Error: AZURE_AI_SEARCH_ENDPOINT is not configured."
+    if not documents:
+        return "No documents to add."
+
+    try:
+        contents = [doc.get("content", "") for doc in documents]
+        vectors = await _embed_many(contents)
+        now = datetime.now(timezone.utc).isoformat()
+        built = [
+            _build_document(
+                title=doc.get("title", ""),
+                entry_type=doc.get("entry_type", "meeting"),
+                customer_name=doc.get("customer_name", ""),
+                short_summary=doc.get("short_summary", ""),
+                context=content,
+                context_vector=vector,
+                project_name=doc.get("project_name", ""),
+                tags=_split_tags(doc.get("tags")),
+                reference_url=doc.get("reference_url", ""),
+                architecture=doc.get("architecture", ""),
+                now=now,
+            )
+            for doc, content, vector in zip(documents, contents, vectors)
+        ]
+        succeeded = await _upload_documents(built)
+
+        lines = [f"Added {len(succeeded)} of {len(built)} documents to vector database.\n"]
+        for doc in built:
+            mark = "✅" if doc["id"] in succeeded else "❌"
+            lines.append(f"- {mark} `{doc['id']}` – {doc['title']}")
+        return "\n".join(lines)
+
+    except Exception as exc:
+        logger.exception("search_add_batch failed")
+        return f"Error adding documents to vector database: {exc}"
@@ -2,10 +2,10 @@
 
 All tool implementations live in dedicated modules:
 
-- ``agents.py``   – ``agents_*`` tools (list / invoke / status / result)
-- ``search.py``   – ``search_*`` tools (vector search / add to index)
-- ``index.py``    – ``index_*`` tools (create index / ingest project log)
-- ``workflows.py``– ``workflows_*`` tools (list workflows / run project-log pipeline)
+- ``agents.py``   – ``agents_*`` tools (list / invoke / status / result / wait)
+- ``search.py``   – ``search_*`` tools (vector search / add to index / batch add)
+- ``index.py``    – ``index_*`` tools (create index / ingest project log / bulk ingest)
+- ``workflows.py``– ``workflows_*`` tools (list workflows / run project-log pipeline / pending ingests / cache stats)
 
 The shared ``FastMCP`` instance is in ``app.py``; Azure client singletons,
 environment variables, and helpers are in ``client.py``.
@@ -21,10 +21,15 @@ stdio (uvx / local MCP clients)::
 HTTP / Container Apps (uvicorn)::
 
     uvicorn foundry_agents_mcp.server:http_app --host 0.0.0.0 --port 8000
+
+Both transports run on uvloop when it is installed (uvicorn's default
+``--loop auto`` picks it up, as does ``--http auto`` for httptools).
 """
 
+import functools
 import logging
 import os
+import anyio
 import dotenv
 
 from azure.core.settings import settings as azure_settings
@@ -32,33 +37,65 @@ from starlette.responses import JSONResponse
 
 from foundry_agents_mcp.app import mcp
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional; not available on Windows
+    uvloop = None
+
 # Load environment variables from a .env file if present
-dotenv.load_dotenv()
+if not os.environ.get("_FOUNDRY_DOTENV_LOADED"):
+    dotenv.load_dotenv(override=False)
+    os.environ["_FOUNDRY_DOTENV_LOADED"] = "1"
+
+_APPINSIGHTS_CONN = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "")
+# Fraction of traces exported, decided once per trace at the root span so
+# sampled traces stay complete.  Setting OTEL_TRACES_SAMPLER selects another
+# sampler and takes precedence over this ratio.
+_TRACES_SAMPLING_RATIO = float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.1"))
 
-# Import all tool modules so their @mcp.tool() decorators register the tools
-# against the shared mcp instance defined in app.py.
-from foundry_agents_mcp import agents, index, search, workflows  # noqa: F401
 
 # ── OpenTelemetry / Application Insights ─────────────────────────────────────
 
-# Tell the Azure SDK to route traces through opentelemetry
-azure_settings.tracing_implementation = "opentelemetry"
 
-_APPINSIGHTS_CONN = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "")
-if _APPINSIGHTS_CONN:
+def _configure_tracing() -> None:
+    # Tell the Azure SDK to route traces through opentelemetry
+    azure_settings.tracing_implementation = "opentelemetry"
+
+    if not _APPINSIGHTS_CONN:
+        return
     try:
         from azure.monitor.opentelemetry import configure_azure_monitor  # noqa: PLC0415
-
-        configure_azure_monitor(connection_string=_APPINSIGHTS_CONN)
-        logging.getLogger("foundry-agents-mcp").info(
-            "Azure Monitor / Application Insights tracing enabled"
-        )
+        from opentelemetry import trace  # noqa: PLC0415
+
+        # A real tracer provider means this process is already configured (the
+        # module was imported again as __main__, or reloaded); a second call
+        # would register another set of exporters and duplicate every span.
+        if isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+            configure_azure_monitor(
+                connection_string=_APPINSIGHTS_CONN,
+                sampling_ratio=_TRACES_SAMPLING_RATIO,
+            )
+            logging.getLogger("foundry-agents-mcp").info(
+                "Azure Monitor / Application Insights tracing enabled (sampling ratio %s)",
+                _TRACES_SAMPLING_RATIO,
+            )
     except ImportError:
         logging.getLogger("foundry-agents-mcp").warning(
             "APPLICATIONINSIGHTS_CONNECTION_STRING is set but "
             "azure-monitor-opentelemetry is not installed; tracing disabled."
         )
 
+
+@functools.cache
+def _setup() -> None:
+    """Register the tools and configure tracing (once, from either entry point)."""
+    # Importing the tool modules registers their @mcp.tool() functions against
+    # the shared mcp instance defined in app.py.
+    from foundry_agents_mcp import agents, index, search, workflows  # noqa: F401, PLC0415
+
+    _configure_tracing()
+
+
 # ── Health check endpoint ─────────────────────────────────────────────────────
 
 
@@ -70,15 +107,28 @@ async def health_check(_request):
 
 # ── ASGI application (HTTP transport for Container Apps) ─────────────────────
 
-http_app = mcp.http_app()
 
-# Instrument the Starlette ASGI app with OpenTelemetry when available
-try:
-    from opentelemetry.instrumentation.starlette import StarletteInstrumentor  # noqa: PLC0415
+def _build_http_app():
+    _setup()
+    app = mcp.http_app()
+
+    # Instrument the Starlette ASGI app with OpenTelemetry when available
+    try:
+        from opentelemetry.instrumentation.starlette import StarletteInstrumentor  # noqa: PLC0415
+
+        StarletteInstrumentor.instrument_app(app)
+    except ImportError:
+        pass
+    return app
 
-    StarletteInstrumentor.instrument_app(http_app)
-except ImportError:
-    pass
+
+def __getattr__(name: str):
+    # uvicorn resolves ``server:http_app`` with getattr, so the ASGI app and its
+    # instrumentation are only built for the HTTP transport, never for stdio.
+    if name == "http_app":
+        app = globals()["http_app"] = _build_http_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ── stdio entry point (uvx / local MCP clients) ───────────────────────────────
@@ -86,9 +136,12 @@ except ImportError:
 
 def main() -> None:
     """Launch the MCP server over stdio (compatible with uvx and local clients)."""
-    mcp.run()
+    _setup()
+    if uvloop is not None:
+        anyio.run(mcp.run_async, backend_options={"use_uvloop": True})
+    else:
+        mcp.run()
 
 
 if __name__ == "__main__":
     main()
-
@@ -17,31 +17,40 @@ Deployment commands
 -------------------
 ``deploy-case-study-agent``     – register CaseStudyAgent in Foundry
 ``deploy-architecture-agent``   – register ArchitectureAgent in Foundry
+``deploy-project-log-agents``   – register both agents concurrently
 ``run-project-log-workflow``    – run the pipeline from the CLI
 """
 
+import time
 from pathlib import Path
 
 from foundry_agents import DEFINITIONS_DIR
-from foundry_agents.project_log_workflow import run_pipeline
+from foundry_agents._llm_cache import cache_stats
+from foundry_agents.project_log_workflow import (
+    QUEUED_MESSAGE,
+    SUCCESS_MESSAGE,
+    ingest_status,
+    run_pipeline,
+)
 
 from foundry_agents_mcp.app import mcp
 from foundry_agents_mcp.client import logger
 
 
-@mcp.tool()
-async def workflows_list_sample_workflows() -> str:
-    """List the available sample workflow and agent definitions.
+# (definitions directory mtime, rendered listing).  Only file names are
+# listed, and the directory mtime changes whenever one is added or removed.
+_list_cache: tuple[int, str] | None = None
 
-    Returns the names, locations, and descriptions of the built-in declarative
-    YAML files in ``src/foundry_agents/definitions/`` and the available CLI
-    deployment/run commands.
+# Successful workflow runs keyed by (story_url, project_name).  Repeating the
+# same request within the TTL returns the earlier report instead of fetching,
+# calling both agents, and ingesting a duplicate entry again.
+_RESULT_TTL_SECS = 3600.0
+_RESULT_CACHE_MAX = 256
+_result_cache: dict[tuple[str, str], tuple[float, str]] = {}
+_result_stats: dict[str, int] = {"hits": 0, "misses": 0}
 
-    Example prompts:
-    - "What sample workflows are available?"
-    - "Show me the built-in workflow definitions"
-    - "List the declarative agent templates I can deploy to Foundry"
-    """
+
+def _render_sample_workflows() -> str:
     lines = ["## Sample Workflow and Agent Definitions\n"]
 
     lines.append("### Declarative YAML definitions (`src/foundry_agents/definitions/`)\n")
@@ -60,6 +69,7 @@ async def workflows_list_sample_workflows() -> str:
         "|---------|-------------|\n"
         "| `deploy-case-study-agent` | Register **CaseStudyAgent** in Azure AI Foundry |\n"
         "| `deploy-architecture-agent` | Register **ArchitectureAgent** in Azure AI Foundry |\n"
+        "| `deploy-project-log-agents` | Register both agents concurrently |\n"
         "| `run-project-log-workflow --url <url>` | Run the full pipeline from the command line |\n"
     )
 
@@ -75,6 +85,26 @@ async def workflows_list_sample_workflows() -> str:
     return "\n".join(lines)
 
 
+@mcp.tool()
+async def workflows_list_sample_workflows() -> str:
+    """List the available sample workflow and agent definitions.
+
+    Returns the names, locations, and descriptions of the built-in declarative
+    YAML files in ``src/foundry_agents/definitions/`` and the available CLI
+    deployment/run commands.
+
+    Example prompts:
+    - "What sample workflows are available?"
+    - "Show me the built-in workflow definitions"
+    - "List the declarative agent templates I can deploy to Foundry"
+    """
+    global _list_cache
+    key = DEFINITIONS_DIR.stat().st_mtime_ns
+    if _list_cache is None or _list_cache[0] != key:
+        _list_cache = (key, _render_sample_workflows())
+    return _list_cache[1]
+
+
 @mcp.tool()
 async def workflows_run_project_log_workflow(
     story_url: str,
@@ -90,13 +120,17 @@ async def workflows_run_project_log_workflow(
        diagram from the case study context and technology tags.
 
     The combined result is stored as a single entry in the Azure AI Search
-    project-log vector index.
+    project-log vector index.  The report is returned as soon as the entry is
+    ready; the upload finishes in the background (see
+    ``workflows_pending_ingests``).  Repeating a successful request for the same
+    URL and project within an hour returns the earlier report without
+    re-running the pipeline.
 
     If ``CaseStudyAgent`` and ``ArchitectureAgent`` have been deployed to
     Azure AI Foundry (via ``deploy-case-study-agent`` /
     ``deploy-architecture-agent``), they are invoked via the Foundry API so
-    that the run is visible in the project telemetry.  Otherwise the same
-    logic runs locally against Azure OpenAI directly.
+    that the run is visible in the project telemetry.  Otherwise both steps
+    are answered by a single direct Azure OpenAI chat completion.
 
     Args:
         story_url: URL of a Microsoft customer success story, e.g.
@@ -108,9 +142,73 @@ async def workflows_run_project_log_workflow(
     - "Index this customer story and generate its architecture: <url>"
     - "Ingest the Commerzbank case study into the project log"
     """
+    key = (story_url, project_name)
+    hit = _result_cache.get(key)
+    if hit is not None:
+        # A report whose background ingest later failed must not be served again
+        if time.monotonic() - hit[0] < _RESULT_TTL_SECS and story_url not in ingest_status()[1]:
+            _result_stats["hits"] += 1
+            return hit[1]
+        del _result_cache[key]
+    _result_stats["misses"] += 1
+
     try:
-        return await run_pipeline(story_url, project_name)
+        result = await run_pipeline(story_url, project_name, background_ingest=True)
     except Exception as exc:
         logger.exception("workflows_run_project_log_workflow failed")
         return f"❌ Workflow failed: {exc}"
 
+    if result.endswith((SUCCESS_MESSAGE, QUEUED_MESSAGE)):
+        if len(_result_cache) >= _RESULT_CACHE_MAX:
+            # Entries are inserted in time order; drop the oldest
+            del _result_cache[next(iter(_result_cache))]
+        _result_cache[key] = (time.monotonic(), result)
+    return result
+
+
+@mcp.tool()
+async def workflows_pending_ingests() -> str:
+    """Show project-log entries still being ingested in the background, and failures.
+
+    ``workflows_run_project_log_workflow`` returns before its index upload
+    completes; use this tool to confirm the entry was stored.
+
+    Example prompts:
+    - "Has the last project-log workflow finished ingesting?"
+    - "Did any background ingests fail?"
+    """
+    pending, failed = ingest_status()
+    if not pending and not failed:
+        return "No background ingests are pending and none have failed."
+
+    lines = ["## Background Ingests\n"]
+    if pending:
+        lines.append(f"### In progress ({len(pending)})\n")
+        lines.extend(f"- `{url}`" for url in pending)
+        lines.append("")
+    if failed:
+        lines.append(f"### Failed ({len(failed)})\n")
+        lines.extend(f"- `{url}` – {error}" for url, error in failed.items())
+        lines.append("\nRun `workflows_run_project_log_workflow` again to retry.")
+    return "\n".join(lines)
+
+
+@mcp.tool()
+async def workflows_cache_stats() -> str:
+    """Show hit/miss counters for the workflow result and agent response caches.
+
+    Example prompts:
+    - "How effective is the workflow cache?"
+    - "Show the project-log workflow cache statistics"
+    """
+    llm = cache_stats()
+    return (
+        "## Workflow Cache Statistics\n\n"
+        "| Cache | Hits | Misses | Entries |\n"
+        "|---|---|---|---|\n"
+        f"| Workflow results | {_result_stats['hits']} | {_result_stats['misses']} "
+        f"| {len(_result_cache)} |\n"
+        f"| Agent responses | {llm['hits']} (+{llm['semantic_hits']} semantic) "
+        f"| {llm['misses']} | – |"
+    )
+
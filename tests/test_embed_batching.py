@@ -0,0 +1,62 @@
+"""Coalescing of concurrent _embed calls into batched embedding requests."""
+
+import asyncio
+
+import pytest
+
+from foundry_agents_mcp import client
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    """Replace _embed_many with a fake that rejects empty strings like Azure does."""
+    calls: list[list[str]] = []
+
+    async def fake_embed_many(texts):
+        calls.append(list(texts))
+        if "" in texts:
+            raise ValueError("400: input must not be empty")
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(client, "_embed_many", fake_embed_many)
+    return calls
+
+
+async def _embed_all(texts):
+    return await asyncio.gather(*(client._embed(text) for text in texts), return_exceptions=True)
+
+
+def test_concurrent_calls_share_one_request(embed_calls):
+    texts = ["a", "bb", "ccc", "dddd"]
+
+    results = asyncio.run(_embed_all(texts))
+
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert embed_calls == [texts]
+
+
+def test_batch_is_capped_at_max_batch(embed_calls, monkeypatch):
+    monkeypatch.setattr(client, "_EMBED_MAX_BATCH", 2)
+
+    results = asyncio.run(_embed_all(["a", "bb", "ccc"]))
+
+    assert results == [[1.0], [2.0], [3.0]]
+    assert sorted(map(len, embed_calls)) == [1, 2]
+
+
+def test_bad_input_fails_only_its_own_caller(embed_calls):
+    results = asyncio.run(_embed_all(["a", "", "ccc"]))
+
+    assert results[0] == [1.0]
+    assert isinstance(results[1], ValueError)
+    assert results[2] == [3.0]
+    # The failed batch is retried one text at a time
+    assert embed_calls[0] == ["a", "", "ccc"]
+    assert sorted(embed_calls[1:]) == [[""], ["a"], ["ccc"]]
+
+
+def test_single_item_failure_is_not_retried(embed_calls):
+    results = asyncio.run(_embed_all([""]))
+
+    assert isinstance(results[0], ValueError)
+    assert embed_calls == [[""]]
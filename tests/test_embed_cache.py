@@ -0,0 +1,115 @@
+"""Embedding cache keys, int8 packing, and the LRU and SQLite tiers."""
+
+import asyncio
+
+import pytest
+
+from foundry_agents_mcp import client
+
+VECTOR = [0.5, -0.25, 0.125, -1.0, 0.0]
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    """Start from an empty LRU with the Redis and SQLite tiers disabled."""
+    monkeypatch.setattr(client, "_embed_cache", client.OrderedDict())
+    monkeypatch.setattr(client, "_get_redis_client", lambda: None)
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_SQLITE_PATH", "")
+    client._get_embed_db.cache_clear()
+    yield
+    client._get_embed_db.cache_clear()
+
+
+def test_cache_keys_ignore_formatting_in_the_normalised_key():
+    exact_a, norm_a = client._embed_cache_keys("Contoso moved to Azure.")
+    exact_b, norm_b = client._embed_cache_keys("  contoso MOVED to azure ")
+
+    assert exact_a != exact_b
+    assert norm_a == norm_b
+    assert norm_a.startswith("n:")
+
+
+def test_cache_keys_depend_on_the_embedding_model(monkeypatch):
+    before = client._embed_cache_keys("text")
+    monkeypatch.setattr(client, "_EMBED_KEY_PREFIX", "other-model\x001536\x00")
+
+    assert client._embed_cache_keys("text") != before
+
+
+def test_pack_is_a_no_op_without_int8(monkeypatch):
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_INT8", False)
+
+    entry = client._pack_embedding(VECTOR)
+
+    assert entry is VECTOR
+    assert client._unpack_embedding(entry) == VECTOR
+
+
+def test_int8_round_trip_stays_within_one_quantisation_step(monkeypatch):
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_INT8", True)
+
+    data, scale = client._pack_embedding(VECTOR)
+    restored = client._unpack_embedding((data, scale))
+
+    assert len(data) == len(VECTOR)
+    assert scale == pytest.approx(1.0 / 127)
+    assert restored == pytest.approx(VECTOR, abs=scale / 2)
+
+
+def test_int8_packs_an_all_zero_vector(monkeypatch):
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_INT8", True)
+
+    assert client._unpack_embedding(client._pack_embedding([0.0, 0.0])) == [0.0, 0.0]
+
+
+@pytest.mark.parametrize("int8", [False, True])
+def test_sqlite_tier_round_trip(tmp_path, monkeypatch, int8):
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_INT8", int8)
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_SQLITE_PATH", str(tmp_path / "embeddings.db"))
+    db = client._get_embed_db()
+    try:
+        keys = client._embed_cache_keys("Contoso moved to Azure.")
+        client._db_store_embedding(db, keys, client._pack_embedding(VECTOR))
+
+        exact = client._db_load_embedding(db, keys[:1])
+        normalised = client._db_load_embedding(db, keys[1:])
+        missing = client._db_load_embedding(db, client._embed_cache_keys("unrelated"))
+    finally:
+        db.close()
+
+    assert missing is None
+    for entry in (exact, normalised):
+        # float32 storage is exact for these values; int8 is within one step
+        assert client._unpack_embedding(entry) == pytest.approx(VECTOR, abs=0.005 if int8 else 0)
+
+
+def test_embed_cached_reuses_vectors_for_formatting_only_edits(monkeypatch):
+    calls: list[str] = []
+
+    async def fake_embed(text):
+        calls.append(text)
+        return list(VECTOR)
+
+    monkeypatch.setattr(client, "_embed", fake_embed)
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_INT8", False)
+
+    async def run():
+        first = await client._embed_cached("Contoso moved to Azure.")
+        second = await client._embed_cached("contoso moved to azure")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == VECTOR
+    assert calls == ["Contoso moved to Azure."]
+
+
+def test_lru_evicts_the_least_recently_used_entry(monkeypatch):
+    monkeypatch.setattr(client, "EMBEDDING_CACHE_SIZE", 2)
+
+    client._remember_embedding("a", [1.0])
+    client._remember_embedding("b", [2.0])
+    client._remember_embedding("a", [1.0])
+    client._remember_embedding("c", [3.0])
+
+    assert list(client._embed_cache) == ["a", "c"]
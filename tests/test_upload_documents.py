@@ -0,0 +1,101 @@
+"""Bulk uploads: batching, and halving batches the service rejects."""
+
+import asyncio
+
+import orjson
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from foundry_agents_mcp import client
+
+
+class _Response:
+    def __init__(self, status_code: int, keys: list[str]) -> None:
+        self.status_code = status_code
+        self.reason = "Request Entity Too Large" if status_code == 413 else "OK"
+        self.headers: dict[str, str] = {}
+        self._keys = keys
+
+    def text(self) -> str:
+        return ""
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HttpResponseError(message=self.reason, response=self)
+
+    def json(self) -> dict:
+        return {"value": [{"key": key, "status": True} for key in self._keys]}
+
+
+class _SearchClient:
+    """Answers with *status* for any batch larger than *max_docs*."""
+
+    def __init__(self, max_docs: int, status: int = 413) -> None:
+        self.max_docs = max_docs
+        self.status = status
+        self.batch_sizes: list[int] = []
+
+    async def send_request(self, request):
+        keys = [doc["id"] for doc in orjson.loads(request.content)["value"]]
+        self.batch_sizes.append(len(keys))
+        if len(keys) > self.max_docs:
+            return _Response(self.status, [])
+        return _Response(200, keys)
+
+
+def _docs(count: int) -> list[dict]:
+    return [{"id": f"doc-{i}"} for i in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(client, "_UPLOAD_SPLIT_BACKOFF_SECS", 0.0)
+    monkeypatch.setattr(client, "AZURE_AI_SEARCH_ENDPOINT", "https://example.search.windows.net")
+
+
+def _install(monkeypatch, search_client: _SearchClient) -> _SearchClient:
+    monkeypatch.setattr(client, "_get_search_client", lambda: search_client)
+    return search_client
+
+
+def test_too_large_batch_is_retried_in_halves(monkeypatch):
+    search = _install(monkeypatch, _SearchClient(max_docs=2))
+
+    uploaded = asyncio.run(client._upload_documents(_docs(8)))
+
+    assert uploaded == {doc["id"] for doc in _docs(8)}
+    assert search.batch_sizes == [8, 4, 2, 2, 4, 2, 2]
+
+
+def test_throttled_batch_is_retried_in_halves(monkeypatch):
+    search = _install(monkeypatch, _SearchClient(max_docs=2, status=503))
+
+    uploaded = asyncio.run(client._upload_documents(_docs(3)))
+
+    assert uploaded == {doc["id"] for doc in _docs(3)}
+    assert search.batch_sizes == [3, 1, 2]
+
+
+def test_single_document_rejection_is_raised(monkeypatch):
+    _install(monkeypatch, _SearchClient(max_docs=0))
+
+    with pytest.raises(HttpResponseError):
+        asyncio.run(client._upload_documents(_docs(1)))
+
+
+def test_other_errors_are_not_split(monkeypatch):
+    search = _install(monkeypatch, _SearchClient(max_docs=2, status=400))
+
+    with pytest.raises(HttpResponseError):
+        asyncio.run(client._upload_documents(_docs(4)))
+    assert search.batch_sizes == [4]
+
+
+def test_lists_over_the_service_limit_are_sent_in_chunks(monkeypatch):
+    monkeypatch.setattr(client, "_UPLOAD_MAX_DOCS", 3)
+    search = _install(monkeypatch, _SearchClient(max_docs=3))
+
+    uploaded = asyncio.run(client._upload_documents(_docs(7)))
+
+    assert uploaded == {doc["id"] for doc in _docs(7)}
+    assert sorted(search.batch_sizes) == [1, 3, 3]